@@ -0,0 +1,75 @@
+"""Benchmark: loading all the tracks of a 200-track album, serial vs parallel pages
+
+The stub server adds a delay to each response, as a remote server would.
+Run it from the repository root::
+
+    python benchmarks/bench_album.py [--tracks 200] [--delay 0.05]
+"""
+import argparse
+import json
+import time
+import warnings
+
+from feeluown.library import BriefAlbumModel
+
+from fuo_kuwo.api import KuwoApi
+from fuo_kuwo.provider import _deserialize_many, provider
+from fuo_kuwo.schemas import KuwoSongSchema
+from stub_server import StubServer, example
+
+ALBUM_PATH = '/api/www/album/albumInfo'
+
+
+def album_pages(count):
+    album = json.loads(example('album_info.json'))
+    songs = album['data']['musicList']
+    tracks = [dict(songs[i % len(songs)], rid=100000 + i) for i in range(count)]
+
+    def route(query):
+        page, limit = int(query['pn']), int(query['rn'])
+        start = (page - 1) * limit
+        data = dict(album['data'], total=count, musicList=tracks[start:start + limit])
+        return dict(album, data=data)
+    return route
+
+
+def serial(aid):
+    # One page after the other, until all the tracks are fetched.
+    songs, page = [], 1
+    while True:
+        data = provider.api.get_album_info(aid, limit=provider.page_size, page=page)['data']
+        songs.extend(_deserialize_many(data['musicList'], KuwoSongSchema))
+        if len(songs) >= int(data['total']) or not data['musicList']:
+            return songs
+        page += 1
+
+
+def parallel(aid):
+    album = BriefAlbumModel(source='kuwo', identifier=str(aid), name='')
+    return provider.album_create_songs_rd(album).readall()
+
+
+def run(name, fn, count):
+    start = time.perf_counter()
+    songs = fn(13962847)
+    elapsed = time.perf_counter() - start
+    assert len(songs) == count
+    print(f'{name:<28} {elapsed * 1000:>8.1f}ms  {len(songs)} tracks')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tracks', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.05)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    with StubServer({ALBUM_PATH: album_pages(args.tracks)}, delay=args.delay) as server:
+        KuwoApi.API_BASE = server.url + '/api/www'
+        run('before: serial pages', serial, args.tracks)
+        provider.model_cache.clear()
+        run('after: album_create_songs_rd', parallel, args.tracks)
+
+
+if __name__ == '__main__':
+    main()
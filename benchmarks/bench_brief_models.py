@@ -0,0 +1,69 @@
+"""Benchmark: memory of a 10k-track playlist with and without shared brief models
+
+Tracks are spread over 500 albums of 200 artists. Run it from the
+repository root::
+
+    python benchmarks/bench_brief_models.py [--songs 10000]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import warnings
+
+from fuo_kuwo import schemas
+from fuo_kuwo.schemas import KuwoSongSchema, get_loader
+from stub_server import example
+
+
+def synthetic_playlist(count):
+    song = json.loads(example('song_detail.json'))['data']
+    items = []
+    for i in range(count):
+        album, artist = i % 500, i % 200
+        items.append(dict(song, rid=100000 + i, name=f'song {i}',
+                          albumid=1000 + album, album=f'专辑 {album}',
+                          artistid=2000 + artist, artist=f'歌手 {artist}'))
+    return items
+
+
+def run(name, items):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    songs = get_loader(KuwoSongSchema).load(items, many=True)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    albums = len({id(song.album) for song in songs})
+    artists = len({id(artist) for song in songs for artist in song.artists})
+    print(f'{name:<20} {current / 1024 / 1024:>7.2f}MB  {current / len(songs):>6.0f}B/track'
+          f'  {elapsed * 1000:>7.1f}ms  {albums} albums {artists} artists')
+    return songs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--songs', type=int, default=10000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    items = synthetic_playlist(args.songs)
+    shared_brief_model = schemas.shared_brief_model
+
+    def new_brief_model(model_class, identifier, name):
+        return model_class(source=schemas.SOURCE, identifier=identifier, name=name)
+
+    schemas.shared_brief_model = new_brief_model
+    try:
+        before = run('before: per song', items)
+    finally:
+        schemas.shared_brief_model = shared_brief_model
+    del before
+    run('after: shared', items)
+
+
+if __name__ == '__main__':
+    main()
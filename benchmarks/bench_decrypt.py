@@ -0,0 +1,58 @@
+"""Benchmark: per-byte XOR/base64 coding vs KwDecrypt
+
+Run it from the repository root::
+
+    python benchmarks/bench_decrypt.py [--sizes 1024,16384,65536]
+"""
+import argparse
+import os
+import time
+
+from fuo_kuwo.enc.decrypt import KwDecrypt
+
+B64 = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+
+def encrypt_per_byte(data):
+    # The previous style: per-byte loops building immutable bytes.
+    key = KwDecrypt.CONST_1
+    xored = bytes()
+    for i, b in enumerate(data):
+        xored += bytes([b ^ key[i % len(key)]])
+    out = bytes()
+    for i in range(0, len(xored), 3):
+        chunk = xored[i:i + 3]
+        n = int.from_bytes(chunk.ljust(3, b'\0'), 'big')
+        chars = bytes(B64[n >> s & 63] for s in (18, 12, 6, 0))
+        out += chars[:len(chunk) + 1] + b'=' * (3 - len(chunk))
+    return out.decode()
+
+
+def run(name, fn, data, seconds):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(data)
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f'{name:<24} {count * len(data) / elapsed / 1e6:>9.2f} MB/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1024,16384,65536')
+    parser.add_argument('--seconds', type=float, default=1)
+    args = parser.parse_args()
+
+    for size in map(int, args.sizes.split(',')):
+        data = os.urandom(size)
+        text = KwDecrypt.encrypt(data)
+        assert encrypt_per_byte(data) == text
+        print(f'-- {size} bytes')
+        run('before: per byte', encrypt_per_byte, data, args.seconds)
+        run('after: encrypt', KwDecrypt.encrypt, data, args.seconds)
+        run('after: decrypt', KwDecrypt.decrypt, text, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
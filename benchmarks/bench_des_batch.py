@@ -0,0 +1,39 @@
+"""Benchmark: base64_encrypt one payload at a time vs base64_encrypt_many
+
+Requires numpy. Run it from the repository root::
+
+    python benchmarks/bench_des_batch.py [--sizes 1,100,10000]
+"""
+import argparse
+import time
+
+from fuo_kuwo.enc.DES import base64_encrypt, base64_encrypt_many
+from bench_des import payloads
+
+
+def run(name, fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(items)
+    elapsed = time.perf_counter() - start
+    count = len(items) * repeat
+    print(f'{name:<20} {count / elapsed:>10.0f} encrypts/s '
+          f'{elapsed / repeat * 1e3:>9.2f} ms/batch')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1,100,10000')
+    args = parser.parse_args()
+
+    for size in map(int, args.sizes.split(',')):
+        items = payloads(size)
+        assert base64_encrypt_many(items) == [base64_encrypt(p) for p in items]
+        repeat = max(1, 2000 // size)
+        print(f'-- {size} payload(s)')
+        run('before: scalar', lambda ps: [base64_encrypt(p) for p in ps], items, repeat)
+        run('after: numpy batch', base64_encrypt_many, items, repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Benchmark: marshmallow schema.load per item vs the fast-path loader
+
+Songs of a 1000-track playlist are built from examples/playlist_info.json.
+Run it from the repository root::
+
+    python benchmarks/bench_deserialize.py [--songs 1000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+import warnings
+
+from fuo_kuwo.schemas import KuwoSongSchema, get_loader
+from stub_server import example
+
+
+def run(name, fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(items)
+    elapsed = time.perf_counter() - start
+    print(f'{name:<28} {len(items) * repeat / elapsed:>10.0f} items/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--songs', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    # Schemas use the deprecated `missing` argument, do not time the warnings.
+    warnings.simplefilter('ignore')
+
+    songs = json.loads(example('playlist_info.json'))['data']['musicList']
+    items = [dict(songs[i % len(songs)], rid=100000 + i) for i in range(args.songs)]
+    run('before: schema per item', lambda xs: [KuwoSongSchema().load(x) for x in xs],
+        items, args.repeat)
+    run('after: fast loader', lambda xs: get_loader(KuwoSongSchema).load(xs, many=True),
+        items, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: building the discovery page, serial vs DiscoveryAggregator
+
+The stub server adds a delay to each response, as a remote server would.
+"cold start" renders the page from the snapshot saved by the aggregator.
+Run it from the repository root::
+
+    python benchmarks/bench_discovery.py [--delay 0.1]
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+from fuo_kuwo.api import KuwoApi
+from fuo_kuwo.discovery import Discovery, DiscoveryAggregator, discovery_requests
+from fuo_kuwo.provider import provider
+from stub_server import StubServer, example
+
+ROUTES = {
+    '/api/www/banner/index/bannerList': example('banner.json'),
+    '/api/www/bang/index/bangList': example('rank_top.json'),
+    '/api/www/bang/bang/bangMenu': example('rank_index.json'),
+    '/api/www/rcm/index/playlist': example('playlist_recommend.json'),
+    '/api/www/radio/index/radioList': example('radio_list.json'),
+    '/api/www/playlist/getTagList': example('playlist_tags.json'),
+    '/api/www/artist/artistInfo': example('artist_recommend.json'),
+}
+
+
+def serial():
+    # One request after the other, as the page was built before.
+    responses = {name: request() for name, request in discovery_requests(provider.api).items()}
+    return Discovery(responses, time.time())
+
+
+def run(name, fn):
+    start = time.perf_counter()
+    discovery = fn()
+    elapsed = time.perf_counter() - start
+    assert len(discovery.playlists) == 11
+    print(f'{name:<28} {elapsed * 1000:>8.1f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--delay', type=float, default=0.1)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    path = os.path.join(tempfile.mkdtemp(), 'discovery.json')
+    with StubServer(ROUTES, delay=args.delay) as server:
+        KuwoApi.API_BASE = server.url + '/api/www'
+        run('before: serial requests', serial)
+        run('after: aggregator fetch', DiscoveryAggregator(provider, path).fetch)
+        run('after: cold start snapshot', DiscoveryAggregator(provider, path).get)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: a new requests.Session per call vs the pooled KuwoApi session
+
+Run it from the repository root::
+
+    python benchmarks/bench_http_pool.py [--requests 2000] [--threads 8]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from fuo_kuwo.api import KuwoApi
+from stub_server import StubServer, example, report
+
+SEARCH_PATH = '/api/www/search/searchMusicBykeyWord'
+
+
+def run(name, fn, n, threads):
+    def timed(i):
+        start = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        latencies = list(executor.map(timed, range(n)))
+    report(name, latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    with StubServer({SEARCH_PATH: example('search.json')}) as server:
+        KuwoApi.API_BASE = server.url + '/api/www'
+        api = KuwoApi()
+        api.set_http_pool(pool_maxsize=args.threads)
+        uri = KuwoApi.API_BASE + SEARCH_PATH[len('/api/www'):] + '?key={}&pn=1&rn=20'
+
+        def session_per_call(i):
+            with requests.Session() as session:
+                session.get(uri.format(f'hello{i}'), cookies=api.cookie, headers=api.headers).json()
+
+        # A keyword per request, identical requests in flight would share
+        # one round trip instead of measuring the pool.
+        for threads in (1, args.threads):
+            print(f'-- {threads} thread(s), {args.requests} requests')
+            run('before: session per call', session_per_call, args.requests, threads)
+            run('after: pooled KuwoApi', lambda i: api.search(f'hello{i}'), args.requests, threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: LocalIndex inserts and query latency
+
+Synthetic songs (names of examples/search.json and rank_music.json mixed
+with random words) are added to an index, then a few kinds of queries are
+timed. Run it from the repository root::
+
+    python benchmarks/bench_local_index.py [--rows 1000000] [--path /tmp/index.sqlite]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from feeluown.library import SearchType
+from fuo_kuwo.index import LocalIndex
+from fuo_kuwo.schemas import KuwoSongSchema, get_loader
+from stub_server import example
+
+WORDS = ['love', 'night', 'remix', 'live', 'summer', 'dream', 'city', 'rain', 'fire', 'star',
+         '爱', '夜', '梦', '雨', '城', '星', '光', '海', '风', '心']
+
+QUERIES = [
+    ('common word', 'love'),
+    ('two words', 'hello live'),
+    ('prefix', 'dre'),
+    ('cjk phrase', '王杰'),
+    ('rare', 'kristian kostov'),
+    ('miss', 'nosuchsong'),
+]
+
+
+def synthetic_songs(count):
+    songs = json.loads(example('search.json'))['data']['list']
+    songs += json.loads(example('rank_music.json'))['data']['musicList']
+    rng = random.Random(0)
+    for i in range(count):
+        song = dict(songs[i % len(songs)])
+        extra = ' '.join(rng.sample(WORDS, 2))
+        song.update(rid=i + 1, name=f"{song['name']} {extra}",
+                    artist=f"{song['artist']} {rng.choice(WORDS)} {i % 5000}")
+        yield song
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--path')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), 'index.sqlite')
+    index = LocalIndex(path, max_entries=args.rows)
+    loader = get_loader(KuwoSongSchema)
+    # Models are loaded by the provider anyway, only the index is timed.
+    elapsed = 0
+    for song in synthetic_songs(args.rows):
+        model = loader.load(song)
+        start = time.perf_counter()
+        index.add(KuwoSongSchema, song, model)
+        elapsed += time.perf_counter() - start
+    start = time.perf_counter()
+    index.flush()
+    elapsed += time.perf_counter() - start
+    print(f'{len(index)} rows added in {elapsed:.1f}s, {args.rows / elapsed:.0f} rows/s, '
+          f'{os.path.getsize(path) / 1024 / 1024:.0f} MB')
+
+    for name, keyword in QUERIES:
+        latencies = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = index.search(keyword, SearchType.so)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        print(f'{name:<14} {keyword!r:<18} {len(results):>3} results '
+              f'p50 {p50:>8.2f} ms  max {latencies[-1] * 1000:>8.2f} ms')
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: parse_lyrics before/after, and line lookup by scan vs bisect
+
+A long lyric file is made by repeating examples/song_lyrics.json.
+Run it from the repository root::
+
+    python benchmarks/bench_lyrics.py [--lines 5000]
+"""
+import argparse
+import json
+import timeit
+from html import unescape
+
+from fuo_kuwo.utils import parse_lrc_time, parse_lyrics, parse_lyrics_timeline
+from stub_server import example
+
+
+def parse_lyrics_before(lyrics):
+    content = []
+    for line in lyrics:
+        time_ = line.get('time')
+        ll = line.get('lineLyric')
+        if not time_:
+            continue
+        content.append(f'[{parse_lrc_time(time_)}]{unescape(ll)}')
+    return '\n'.join(content)
+
+
+def line_at_scan(lrc, position):
+    # Scan lrc text for the last line before position, as a naive sync does.
+    found = None
+    for line in lrc.splitlines():
+        minute, seconds = line[1:line.index(']')].split(':')
+        if int(minute) * 60 + float(seconds) > position:
+            break
+        found = line[line.index(']') + 1:]
+    return found
+
+
+def timed(name, fn, number, unit):
+    # The best of a few runs, to reduce the noise.
+    elapsed = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f'{name:<24} {elapsed * 1e6:>10.1f} us/{unit}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=5000)
+    args = parser.parse_args()
+
+    base = json.loads(example('song_lyrics.json'))['data']['lrclist']
+    span = float(base[-1]['time']) + 5
+    lyrics = []
+    for i in range(args.lines):
+        line = base[i % len(base)]
+        lyrics.append(dict(line, time=f"{float(line['time']) + span * (i // len(base)):.2f}"))
+    assert parse_lyrics(lyrics) == parse_lyrics_before(lyrics)
+
+    print(f'-- {args.lines} lines')
+    timed('parse before', lambda: parse_lyrics_before(lyrics), 20, 'file')
+    timed('parse after', lambda: parse_lyrics(lyrics), 20, 'file')
+    lrc = parse_lyrics(lyrics)
+    timeline = parse_lyrics_timeline(lyrics)
+    position = float(lyrics[-1]['time']) * 0.75
+    assert timeline.line_at(position) == line_at_scan(lrc, position)
+    timed('line_at: scan lrc', lambda: line_at_scan(lrc, position), 20, 'lookup')
+    timed('line_at: bisect', lambda: timeline.line_at(position), 10000, 'lookup')
+
+
+if __name__ == '__main__':
+    main()
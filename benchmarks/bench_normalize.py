@@ -0,0 +1,50 @@
+"""Benchmark: normalize_str with and without the fast path and cache
+
+Names of examples/rank_music.json and examples/playlist_info.json are
+normalized as many times as they would be when reading many pages.
+Run it from the repository root::
+
+    python benchmarks/bench_normalize.py [--pages 200]
+"""
+import argparse
+import html
+import json
+import time
+import unicodedata
+
+from fuo_kuwo.schemas import normalize_cache_info, normalize_str
+from stub_server import example
+
+
+def normalize_str_before(s):
+    return unicodedata.normalize('NFKC', html.unescape(s))
+
+
+def run(name, fn, strings, pages):
+    start = time.perf_counter()
+    for _ in range(pages):
+        for s in strings:
+            fn(s)
+    elapsed = time.perf_counter() - start
+    print(f'{name:<20} {len(strings) * pages / elapsed:>12.0f} strings/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=200)
+    args = parser.parse_args()
+
+    for name in ('rank_music.json', 'playlist_info.json'):
+        songs = json.loads(example(name))['data']['musicList']
+        strings = [song[key] for song in songs for key in ('name', 'artist', 'album')]
+        assert [normalize_str(s) for s in strings] == \
+            [normalize_str_before(s) for s in strings]
+        fast = sum(1 for s in strings if normalize_str(s) is s)
+        print(f'-- {name}: {len(strings)} strings, {fast} returned as is')
+        run('before', normalize_str_before, strings, args.pages)
+        run('after', normalize_str, strings, args.pages)
+        print(normalize_cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: memory per track of SongModel lists vs SongTable rows
+
+Run it from the repository root::
+
+    python benchmarks/bench_song_table.py [--songs 5000]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import warnings
+
+from fuo_kuwo.compact import SongTable
+from fuo_kuwo.schemas import KuwoSongSchema, get_loader
+from bench_brief_models import synthetic_playlist
+
+
+def measure(name, build, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{name:<24} {current / 1024 / 1024:>7.2f}MB  {current / count:>6.0f}B/track'
+          f'  {elapsed * 1000:>7.1f}ms')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--songs', type=int, default=5000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    # Items are parsed from json, as they would be from a response.
+    items = json.loads(json.dumps(synthetic_playlist(args.songs)))
+    models = measure('before: SongModel list',
+                     lambda: get_loader(KuwoSongSchema).load(items, many=True), args.songs)
+    del models
+
+    def build_table():
+        table = SongTable()
+        for item in items:
+            table.append(item)
+        return table
+
+    table = measure('after: SongTable', build_table, args.songs)
+    start = time.perf_counter()
+    for row in range(len(table)):
+        table.get(row)
+    elapsed = time.perf_counter() - start
+    print(f'materialize all rows: {elapsed * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
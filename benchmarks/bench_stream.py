@@ -0,0 +1,69 @@
+"""Benchmark: peak memory of reading big pages, parsed whole vs streamed
+
+Run it from the repository root::
+
+    python benchmarks/bench_stream.py [--songs 2000] [--page-sizes 100,500,1000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from fuo_kuwo.api import KuwoApi
+from fuo_kuwo.cache import LRUCache
+from fuo_kuwo.provider import create_g, provider
+from fuo_kuwo.schemas import KuwoSongSchema
+from stub_server import StubServer, example
+
+PLAYLIST_PATH = '/api/www/playlist/playListInfo'
+
+
+def build_pages(count, page_size):
+    template = json.loads(example('playlist_info.json'))
+    songs = template['data']['musicList']
+    pages = {}
+    for page in range(1, (count + page_size - 1) // page_size + 1):
+        start = (page - 1) * page_size
+        music_list = []
+        for i in range(start, min(start + page_size, count)):
+            song = dict(songs[i % len(songs)])
+            song['rid'] = 100000 + i
+            music_list.append(song)
+        template['data'].update(total=str(count), musicList=music_list)
+        pages[str(page)] = json.dumps(template).encode()
+    return pages
+
+
+def run(name, stream, page_size, count):
+    # Do not let the model cache keep every song alive.
+    provider.model_cache = LRUCache(max_entries=1)
+    tracemalloc.start()
+    start = time.perf_counter()
+    reader = create_g(provider.api.get_playlist_info, 1, KuwoSongSchema,
+                      list_key='musicList', page_size=page_size, prefetch=0, stream=stream)
+    read = sum(1 for _ in reader)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert read == count
+    print(f'{name:<20} {elapsed * 1000:>8.1f}ms  peak {peak / 1024 / 1024:>7.2f}MB')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--songs', type=int, default=2000)
+    parser.add_argument('--page-sizes', default='100,500,1000')
+    args = parser.parse_args()
+
+    for page_size in map(int, args.page_sizes.split(',')):
+        pages = build_pages(args.songs, page_size)
+        routes = {PLAYLIST_PATH: lambda query: pages[query['pn']]}
+        with StubServer(routes) as server:
+            KuwoApi.API_BASE = server.url + '/api/www'
+            print(f'-- page size {page_size}, {args.songs} songs')
+            run('before: whole page', False, page_size, args.songs)
+            run('after: streamed', True, page_size, args.songs)
+
+
+if __name__ == '__main__':
+    main()
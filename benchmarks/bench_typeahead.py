@@ -0,0 +1,94 @@
+"""Benchmark: search-as-you-type with and without TypeaheadSearch
+
+Keystrokes of a few typing sessions (with typos and backspaces) are sent
+every ``--interval`` seconds. The search API is simulated in process with a
+``--latency`` delay and returns the songs of examples/search.json, filtered
+by the keyword. Like the kuwo API, one page holds 20 results.
+Run it from the repository root::
+
+    python benchmarks/bench_typeahead.py [--interval 0.08] [--latency 0.15] [--debounce 0.2]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from feeluown.library import SearchType
+from fuo_kuwo.provider import _deserialize_many
+from fuo_kuwo.schemas import KuwoSongSchema
+from fuo_kuwo.typeahead import TypeaheadSearch, _matches, _normalize
+from stub_server import example
+
+SESSIONS = ['hello adele', 'hello\b\b\b\bllo wang', 'hel\blo omfg', 'hello\b\b\b\b\bhello']
+
+
+def keystrokes(session):
+    text = ''
+    for c in session:
+        text = text[:-1] if c == '\b' else text + c
+        yield text
+
+
+def run(name, search, songs, interval, latency):
+    stats = {'requests': 0, 'latencies': []}
+
+    async def fetch(keyword):
+        stats['requests'] += 1
+        await asyncio.sleep(latency)
+        query = _normalize(keyword)
+        objs = [song for song in songs if _matches(query, song)]
+        # One page of 20 results, like the kuwo API.
+        return objs[:20], len(objs)
+
+    async def session(text):
+        pending = []
+        for keyword in keystrokes(text):
+            pending.append(asyncio.ensure_future(search(fetch, keyword)))
+            await asyncio.sleep(interval)
+        # Only the final keyword matters to the user once they stop typing.
+        start = time.perf_counter()
+        await pending[-1]
+        stats['latencies'].append(time.perf_counter() - start)
+        await asyncio.gather(*pending)
+
+    async def main():
+        for text in SESSIONS:
+            await session(text)
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    latency = sum(stats['latencies']) / len(stats['latencies'])
+    print(f'{name:<12} {stats["requests"]:>4} requests {stats["requests"] / elapsed:>6.1f} QPS'
+          f'  final result after {latency * 1000:>6.1f} ms')
+
+
+def naive():
+    async def search(fetch, keyword):
+        return (await fetch(keyword))[0]
+    return search
+
+
+def typeahead(debounce):
+    engines = {}
+
+    async def search(fetch, keyword):
+        if 'engine' not in engines:
+            # Without --debounce, measure the default of TypeaheadSearch.
+            kwargs = {} if debounce is None else {'debounce': debounce}
+            engines['engine'] = TypeaheadSearch(SearchType.so, fetch=fetch, **kwargs)
+        return await engines['engine'].search(keyword)
+    return search
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--interval', type=float, default=0.08)
+    parser.add_argument('--latency', type=float, default=0.15)
+    parser.add_argument('--debounce', type=float, default=None)
+    args = parser.parse_args()
+
+    songs = _deserialize_many(json.loads(example('search.json'))['data']['list'],
+                              KuwoSongSchema)
+    run('naive', naive(), songs, args.interval, args.latency)
+    run('typeahead', typeahead(args.debounce), songs, args.interval, args.latency)
@@ -0,0 +1,95 @@
+"""A tiny local HTTP server which mimics the kuwo API for benchmarks
+
+Responses are served from the ``examples`` directory (or from callables), so
+benchmarks measure our client code instead of the internet.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+
+def example(name):
+    """Load an example response body as bytes"""
+    return (EXAMPLES_DIR / name).read_bytes()
+
+
+class StubServer:
+    """Serve ``routes`` on localhost in a background thread
+
+    ``routes`` maps a request path to bytes, or to a callable which receives
+    the parsed query dict and returns bytes or a json serializable object.
+
+    >>> with StubServer({'/ping': b'pong'}) as server:
+    ...     url = server.url + '/ping'
+    """
+
+    def __init__(self, routes, delay=0):
+        self.routes = routes
+        self.delay = delay
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        routes, delay = self.routes, self.delay
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so that clients can keep connections alive.
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, avoid the Nagle delay.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                route = routes.get(parts.path)
+                if route is None:
+                    self.send_error(404)
+                    return
+                if callable(route):
+                    query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                    route = route(query)
+                if not isinstance(route, bytes):
+                    route = json.dumps(route).encode()
+                if delay:
+                    threading.Event().wait(delay)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(route)))
+                self.end_headers()
+                self.wfile.write(route)
+
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def report(name, latencies, elapsed):
+    """Print requests/sec and p50/p99 latency (in ms)"""
+    print(f'{name:<32} {len(latencies) / elapsed:>10.1f} req/s'
+          f'  p50 {percentile(latencies, 50) * 1000:>7.2f}ms'
+          f'  p99 {percentile(latencies, 99) * 1000:>7.2f}ms')
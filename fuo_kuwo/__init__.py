@@ -13,6 +13,7 @@ from .provider import provider
 def enable(app: App):
     global ui_mgr
     app.library.register(provider)
+    provider.media_prefetcher.watch(app.playlist)
     if app.mode & App.GuiMode:
         from .ui import ProviderUi
 
@@ -22,5 +23,6 @@ def enable(app: App):
 
 def disable(app: App):
     app.library.deregister(provider)
+    provider.media_prefetcher.unwatch()
     if app.mode & App.GuiMode:
         app.providers.remove(provider.identifier)
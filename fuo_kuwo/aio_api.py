@@ -0,0 +1,130 @@
+import asyncio
+import json
+from typing import Awaitable
+
+import aiohttp
+from feeluown.excs import ProviderIOError
+
+from fuo_kuwo.api import KuwoApi
+
+
+class AsyncKuwoApi(KuwoApi):
+    """ asyncio twin of :class:`KuwoApi`
+
+    All endpoints of KuwoApi are available with the same signature, but they
+    return awaitables, for example ``await AsyncKuwoApi().search('hello')``.
+    Paged endpoints do not offer ``stream``, responses are parsed at once.
+    Requests are sent with aiohttp through one shared connection pool, so
+    hundreds of concurrent lookups do not need a thread each.
+
+    aiohttp sessions are bound to an event loop, each loop sending requests
+    gets its own session. Network errors and invalid json responses are
+    raised as ProviderIOError.
+    """
+
+    def __init__(self, pool_connections=8, pool_maxsize=16, pool_block=False):
+        #: aiohttp sessions keyed by the event loop they were created in
+        self._sessions = {}
+        super().__init__(pool_connections, pool_maxsize, pool_block)
+
+    @staticmethod
+    def _create_session():
+        # aiohttp sessions must be created within a running event loop.
+        return None
+
+    def set_http_pool(self, pool_connections=8, pool_maxsize=16, pool_block=False):
+        """ configure the connection pool
+
+        :param pool_connections: max number of connections in total is
+            ``pool_connections * pool_maxsize``
+        :param pool_maxsize: max number of connections per host
+        :param pool_block: ignored, aiohttp always waits for a free connection
+
+        The new limits apply to sessions created afterwards, call :meth:`close`
+        to recreate the one of the current loop.
+        """
+        self._limit = pool_connections * pool_maxsize
+        self._limit_per_host = pool_maxsize
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            # Sessions of closed loops, e.g. after each asyncio.run, can not
+            # be used nor closed anymore.
+            for closed_loop in [other for other in self._sessions if other.is_closed()]:
+                del self._sessions[closed_loop]
+            connector = aiohttp.TCPConnector(limit=self._limit,
+                                             limit_per_host=self._limit_per_host)
+            session = self._sessions[loop] = aiohttp.ClientSession(
+                connector=connector,
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return session
+
+    async def close(self):
+        """ close the connection pool of the current event loop """
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def request(self, method: str, uri: str, **kwargs) -> str:
+        """ send a request with the shared session and return the response text
+
+        :raise ProviderIOError: the request failed or timed out
+        """
+        kwargs.pop('timeout', None)
+        try:
+            async with self._get_session().request(method, uri, **kwargs) as response:
+                return await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ProviderIOError(f'{method} {uri} failed: {e!r}') from e
+
+    async def _get_json(self, uri: str, endpoint=None, **kwargs) -> dict:
+        # The response cache is only used by the blocking client.
+        kwargs.setdefault('cookies', self.cookie)
+        kwargs.setdefault('headers', self.headers)
+        # Kuwo does not always respond with an application/json content type.
+        text = await self.request('GET', uri, **kwargs)
+        try:
+            return json.loads(text)
+        except ValueError as e:
+            raise ProviderIOError(f'invalid json response of {uri}') from e
+
+    async def _get_text(self, uri: str, **kwargs) -> str:
+        kwargs.setdefault('headers', self.headers)
+        return await self.request('GET', uri, **kwargs)
+
+    async def _post_text(self, uri: str, **kwargs) -> str:
+        kwargs.setdefault('headers', self.headers)
+        return await self.request('POST', uri, **kwargs)
+
+    # Paged endpoints, without the `stream` parameter of the blocking client.
+
+    def search(self, keyword: str, limit=20, page=1) -> Awaitable[dict]:
+        return super().search(keyword, limit, page)
+
+    def search_album(self, keyword: str, limit=20, page=1) -> Awaitable[dict]:
+        return super().search_album(keyword, limit, page)
+
+    def search_artist(self, keyword: str, limit=20, page=1) -> Awaitable[dict]:
+        return super().search_artist(keyword, limit, page)
+
+    def search_playlist(self, keyword: str, limit=20, page=1) -> Awaitable[dict]:
+        return super().search_playlist(keyword, limit, page)
+
+    def get_album_info(self, aid: int, limit=20, page=1) -> Awaitable[dict]:
+        return super().get_album_info(aid, limit, page)
+
+    def get_playlist_info(self, pid: int, limit=20, page=1) -> Awaitable[dict]:
+        return super().get_playlist_info(pid, limit, page)
+
+    def get_artist_songs(self, aid: int, limit=20, page=1) -> Awaitable[dict]:
+        return super().get_artist_songs(aid, limit, page)
+
+    def get_artist_albums(self, aid: int, limit=20, page=1) -> Awaitable[dict]:
+        return super().get_artist_albums(aid, limit, page)
+
+    def rank_music(self, bid: int, limit=20, page=1) -> Awaitable[dict]:
+        return super().rank_music(bid, limit, page)
@@ -1,11 +1,18 @@
 import logging
+import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
+from typing import Optional, Union
 from hashlib import md5, sha1
 
 import requests
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
 from requests.cookies import RequestsCookieJar
+from fuo_kuwo.cache import LRUCache, ResponseCache, RESPONSE_CACHE_FILE
 from fuo_kuwo.enc.DES import base64_encrypt
+from fuo_kuwo.jsonstream import JsonListStream
 from fuo_kuwo.utils import digest_encrypt
 
 logger = logging.getLogger(__name__)
@@ -21,6 +28,46 @@ class Singleton(type):
         return cls._instances[cls]
 
 
+class SingleFlight:
+    """ share one call among concurrent callers asking for the same key
+
+    The first caller runs the function, callers arriving while it runs
+    wait for it and get the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        #: number of calls which actually ran
+        self.calls = 0
+        #: number of calls which waited for a running one instead
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = Future()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+
 class KuwoApi(object, metaclass=Singleton):
     """ kuwo music API class """
     API_BASE: str = 'http://www.kuwo.cn/api/www'
@@ -54,9 +101,34 @@ class KuwoApi(object, metaclass=Singleton):
         'lq': 'MP3128'
     }
 
-    def __init__(self):
-        """ class initializer """
+    #: seconds a cached response stays fresh, only these endpoints are cached
+    CACHE_TTLS = {
+        'song_detail': 24 * 60 * 60,
+        'song_lyrics': 7 * 24 * 60 * 60,
+        'album_info': 24 * 60 * 60,
+        'artist_info': 24 * 60 * 60,
+        'playlist_tags': 24 * 60 * 60,
+        'rank_index': 24 * 60 * 60,
+        'radio_list': 60 * 60,
+    }
+
+    #: bytes read at a time from streamed responses
+    STREAM_CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, pool_connections=8, pool_maxsize=16, pool_block=False):
+        """ class initializer
+
+        :param pool_connections: number of per-host connection pools to keep
+        :type pool_connections: int
+        :param pool_maxsize: max number of kept-alive connections per host
+        :type pool_maxsize: int
+        :param pool_block: block when a host has no free connection, instead of
+            opening a throwaway one, so pool_maxsize becomes a hard per-host limit
+        :type pool_block: bool
+        """
         self.timeout = 30
+        self._session = self._create_session()
+        self.set_http_pool(pool_connections, pool_maxsize, pool_block)
         self.headers = {
             'Accept': '*/*',
             'Accept-Encoding': 'gzip,deflate',
@@ -75,6 +147,118 @@ class KuwoApi(object, metaclass=Singleton):
         self._userid = ''
         self._sid = ''
         self._cookies = {}
+        self.cache: Optional[ResponseCache] = None
+        #: identical GET requests in flight at the same time share one round trip
+        self.single_flight = SingleFlight()
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        #: encrypted mobi query strings, keyed by (rid, formats)
+        self.mobi_query_cache = LRUCache(max_entries=4096, max_bytes=1024 * 1024, sizeof=len)
+
+    @staticmethod
+    def _create_session():
+        session = requests.Session()
+        # Every call passes its cookies explicitly, do not let the shared session
+        # accumulate cookies set by the servers.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def set_http_pool(self, pool_connections=8, pool_maxsize=16, pool_block=False):
+        """ (re)configure the connection pool shared by all API calls
+
+        The session is thread safe for our usage, so a single pool is shared by
+        all worker threads. Connections to a host are kept alive and reused.
+        """
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def request(self, method: str, uri: str, **kwargs) -> requests.Response:
+        """ send a request with the shared, pooled session """
+        kwargs.setdefault('timeout', self.timeout)
+        return self._session.request(method, uri, **kwargs)
+
+    def enable_cache(self, path: str = RESPONSE_CACHE_FILE, max_entries: int = 10000,
+                     max_stale: int = 7 * 24 * 60 * 60):
+        """ cache responses of rarely changing endpoints on disk
+
+        :param path: SQLite database file
+        :param max_entries: max number of cached responses, the least recently
+            used ones are evicted
+        :param max_stale: seconds an expired response can still be returned,
+            while it is revalidated in background
+        """
+        self.cache = ResponseCache(path, max_entries=max_entries, max_stale=max_stale)
+
+    def disable_cache(self):
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def _get_json(self, uri: str, endpoint: Optional[str] = None, **kwargs) -> dict:
+        kwargs.setdefault('cookies', self.cookie)
+        kwargs.setdefault('headers', self.headers)
+        if self.cache is None or endpoint not in KuwoApi.CACHE_TTLS:
+            return self._fetch_json(uri, **kwargs)
+
+        data, fresh = self.cache.get(uri)
+        if data is None:
+            return self._fetch_and_cache(uri, endpoint, **kwargs)
+        if not fresh:
+            self._revalidate(uri, endpoint, **kwargs)
+        return data
+
+    def _fetch_json(self, uri: str, **kwargs) -> dict:
+        key = ('json', uri, tuple(sorted((kwargs.get('params') or {}).items())))
+        return self.single_flight.do(
+            key, lambda: self.request('GET', uri, **kwargs).json())
+
+    def _fetch_and_cache(self, uri: str, endpoint: str, **kwargs) -> dict:
+        data = self._fetch_json(uri, **kwargs)
+        # Error responses should not be cached. Most endpoints report
+        # 'code', the mobile ones report 'status'.
+        if isinstance(data, dict) and data.get('code', data.get('status')) == 200:
+            self.cache.set(uri, data, KuwoApi.CACHE_TTLS[endpoint])
+        return data
+
+    def _revalidate(self, uri: str, endpoint: str, **kwargs):
+        with self._revalidating_lock:
+            if uri in self._revalidating:
+                return
+            self._revalidating.add(uri)
+
+        def revalidate():
+            try:
+                self._fetch_and_cache(uri, endpoint, **kwargs)
+            except Exception:  # noqa
+                logger.exception(f'revalidate cached response failed: {uri}')
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(uri)
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    def _stream_json(self, uri: str, list_key: str, **kwargs) -> JsonListStream:
+        """ stream the items of ``data[list_key]`` while the response is received
+
+        Streamed responses are neither cached nor shared with identical requests.
+        """
+        kwargs.setdefault('cookies', self.cookie)
+        kwargs.setdefault('headers', self.headers)
+        response = self.request('GET', uri, stream=True, **kwargs)
+        return JsonListStream(response.iter_content(KuwoApi.STREAM_CHUNK_SIZE),
+                              ('data', list_key), close=response.close)
+
+    def _get_text(self, uri: str, **kwargs) -> str:
+        kwargs.setdefault('headers', self.headers)
+        return self.single_flight.do(
+            ('text', uri), lambda: self.request('GET', uri, **kwargs).text)
+
+    def _post_text(self, uri: str, **kwargs) -> str:
+        kwargs.setdefault('headers', self.headers)
+        return self.request('POST', uri, **kwargs).text
 
     def set_cookies(self, cookies):
         if cookies:
@@ -101,12 +285,10 @@ class KuwoApi(object, metaclass=Singleton):
             'bigid': 1,
             'uid': self._userid,
         }
-        with requests.Session() as session:
-            response = session.get(uri, params=params, headers=self.mobi_headers)
-            data = response.json()
-            return data
+        return self._get_json(uri, params=params, headers=self.mobi_headers, cookies=None)
 
-    def search(self, keyword: str, limit=20, page=1) -> dict:
+    def search(self, keyword: str, limit=20, page=1,
+               stream=False) -> Union[dict, JsonListStream]:
         """kuwo web search API
 
         :param keyword: keyword of song/artist/album
@@ -115,16 +297,17 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: current page, defaults to 1
         :type page: int
+        :param stream: return a stream of the `list` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/search/searchMusicBykeyWord?key={keyword}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'list')
+        return self._get_json(uri)
 
-    def search_album(self, keyword: str, limit=20, page=1) -> dict:
+    def search_album(self, keyword: str, limit=20, page=1,
+                     stream=False) -> Union[dict, JsonListStream]:
         """kuwo search album API
 
         :param keyword: keyword of album
@@ -133,16 +316,17 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: current page
         :type page: int
+        :param stream: return a stream of the `albumList` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/search/searchAlbumBykeyWord?key={keyword}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'albumList')
+        return self._get_json(uri)
 
-    def search_artist(self, keyword: str, limit=20, page=1) -> dict:
+    def search_artist(self, keyword: str, limit=20, page=1,
+                      stream=False) -> Union[dict, JsonListStream]:
         """kuwo search artist list
 
         :param keyword: keyword of artist
@@ -151,16 +335,17 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: current page
         :type page: int
+        :param stream: return a stream of the `artistList` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/search/searchArtistBykeyWord?key={keyword}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'artistList')
+        return self._get_json(uri)
 
-    def search_playlist(self, keyword: str, limit=20, page=1) -> dict:
+    def search_playlist(self, keyword: str, limit=20, page=1,
+                        stream=False) -> Union[dict, JsonListStream]:
         """kuwo search playlist API
 
         :param keyword: keyword of playlist
@@ -169,14 +354,14 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: current page
         :type page: int
+        :param stream: return a stream of the `list` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/search/searchPlayListBykeyWord?key={keyword}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'list')
+        return self._get_json(uri)
 
     def get_song_detail(self, rid: int) -> dict:
         """get song detail by rid
@@ -187,10 +372,7 @@ class KuwoApi(object, metaclass=Singleton):
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/music/musicInfo?mid={rid}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri, endpoint='song_detail')
 
     def get_song_url(self, rid: int) -> dict:
         """get song url for web (128kmp3)
@@ -201,10 +383,7 @@ class KuwoApi(object, metaclass=Singleton):
         :rtype: dict
         """
         uri = KuwoApi.HTTP_HOST + f'/api/v1/www/music/playUrl?mid={rid}&type=music&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri)
 
     def get_song_url_mobi(self, rid: int, quality: str) -> str:
         """get song url for app (128/192/320kmp3, flac, app, ...)
@@ -222,13 +401,20 @@ class KuwoApi(object, metaclass=Singleton):
         else:
             logger.debug(f'Querying best mp3: {rid} ({quality})')
             formats = 'mp3|aac'
-        payload = f'corp=kuwo&p2p=1&type=convert_url2&sig=0&format={formats}&rid={rid}'
-        uri = KuwoApi.MOBI_HOST + '/mobi.s?f=kuwo&q=' + base64_encrypt(payload)
-        with requests.Session() as session:
-            response = session.get(uri, headers=self.mobi_headers)
-            return response.text
-
-    def get_album_info(self, aid: int, limit=20, page=1) -> dict:
+        uri = KuwoApi.MOBI_HOST + '/mobi.s?f=kuwo&q=' + self._mobi_query(rid, formats)
+        return self._get_text(uri, headers=self.mobi_headers)
+
+    def _mobi_query(self, rid, formats: str) -> str:
+        key = (str(rid), formats)
+        query = self.mobi_query_cache.get(key)
+        if query is None:
+            payload = f'corp=kuwo&p2p=1&type=convert_url2&sig=0&format={formats}&rid={rid}'
+            query = base64_encrypt(payload)
+            self.mobi_query_cache.set(key, query)
+        return query
+
+    def get_album_info(self, aid: int, limit=20, page=1,
+                       stream=False) -> Union[dict, JsonListStream]:
         """ kuwo album info API
 
         :param aid: album id
@@ -237,14 +423,14 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: song list current page
         :type page: int
+        :param stream: return a stream of the `musicList` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/album/albumInfo?albumId={aid}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'musicList')
+        return self._get_json(uri, endpoint='album_info')
 
     def get_artist_info(self, aid: int, limit=20, page=1) -> dict:
         """ kuwo artist info API
@@ -259,12 +445,10 @@ class KuwoApi(object, metaclass=Singleton):
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/artist/artist?artistid={aid}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri, endpoint='artist_info')
 
-    def get_playlist_info(self, pid: int, limit=20, page=1) -> dict:
+    def get_playlist_info(self, pid: int, limit=20, page=1,
+                          stream=False) -> Union[dict, JsonListStream]:
         """ kuwo playlist info API
 
         :param pid: playlist id
@@ -273,16 +457,17 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: song list current page
         :type page: int
+        :param stream: return a stream of the `musicList` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/playlist/playListInfo?pid={pid}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'musicList')
+        return self._get_json(uri)
 
-    def get_artist_songs(self, aid: int, limit=20, page=1) -> dict:
+    def get_artist_songs(self, aid: int, limit=20, page=1,
+                         stream=False) -> Union[dict, JsonListStream]:
         """ kuwo artist song list
 
         :param aid: album id
@@ -291,16 +476,17 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: song list current page
         :type page: int
+        :param stream: return a stream of the `list` items, see :meth:`_stream_json`
         :return: artist info response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/artist/artistMusic?artistid={aid}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'list')
+        return self._get_json(uri)
 
-    def get_artist_albums(self, aid: int, limit=20, page=1) -> dict:
+    def get_artist_albums(self, aid: int, limit=20, page=1,
+                          stream=False) -> Union[dict, JsonListStream]:
         """ kuwo artist album list
 
         :param aid: album id
@@ -309,14 +495,14 @@ class KuwoApi(object, metaclass=Singleton):
         :type limit: int
         :param page: album list current page
         :type page: int
+        :param stream: return a stream of the `albumList` items, see :meth:`_stream_json`
         :return: response data
         :rtype: dict
         """
         uri = KuwoApi.API_BASE + f'/artist/artistAlbum?artistid={aid}&pn={page}&rn={limit}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'albumList')
+        return self._get_json(uri)
 
     def get_song_mv(self, rid: int) -> dict:
         """ kuwo mv url API
@@ -327,9 +513,7 @@ class KuwoApi(object, metaclass=Singleton):
         :rtype: dict
         """
         uri = KuwoApi.HTTP_HOST + f'/api/v1/www/music/playUrl?mid={rid}&type=mv&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            return response.json()
+        return self._get_json(uri)
 
     def get_song_lyrics(self, rid: int) -> dict:
         """ kuwo song lyrics url
@@ -340,18 +524,14 @@ class KuwoApi(object, metaclass=Singleton):
         :rtype: dict
         """
         uri = KuwoApi.M_HOST + f'/newh5/singles/songinfoandlrc?musicId={rid}'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            return response.json()
+        return self._get_json(uri, endpoint='song_lyrics')
 
     def get_mobile_verify_code(self, mobile: str, type_: int = 0):
         secret = digest_encrypt(digest_encrypt('imbadboy@!153').upper() + digest_encrypt(mobile + str(time.time()))
                                 .upper()).upper()
         payload = f'mobile={mobile}&type={type_}&tm={str(time.time())}&secret={secret}'
         uri = KuwoApi.LOGIN_HOST + '/send_sms?f=ar&q=' + base64_encrypt(payload)
-        with requests.Session() as session:
-            response = session.post(uri, headers=self.mobi_headers)
-            return response.text
+        return self._post_text(uri, headers=self.mobi_headers)
 
     def radio_list(self) -> dict:
         """
@@ -359,10 +539,7 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/radio/index/radioList?&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri, endpoint='radio_list')
 
     def rank_index(self) -> dict:
         """
@@ -370,24 +547,22 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/bang/bang/bangMenu?&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri, endpoint='rank_index')
 
-    def rank_music(self, bid: int, limit=20, page=1) -> dict:
+    def rank_music(self, bid: int, limit=20, page=1,
+                   stream=False) -> Union[dict, JsonListStream]:
         """
         榜单歌曲
         :param bid:
         :param limit:
         :param page:
+        :param stream: return a stream of the `musicList` items, see :meth:`_stream_json`
         :return:
         """
         uri = KuwoApi.API_BASE + f'/bang/bang/musicList?bangId={bid}&pn={page}&rn={limit}&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        if stream:
+            return self._stream_json(uri, 'musicList')
+        return self._get_json(uri)
 
     def rank_top(self):
         """
@@ -395,10 +570,7 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/bang/index/bangList?&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri)
 
     def playlist_recommend(self, limit=20, page=1) -> dict:
         """
@@ -408,10 +580,7 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/rcm/index/playlist?id=rec&pn={page}&rn={limit}&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri)
 
     def banner(self) -> dict:
         """
@@ -419,10 +588,7 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/banner/index/bannerList?&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri)
 
     def comment(self, sid: int, type_: str, digest_: int, limit=20, page=1) -> dict:
         """
@@ -436,10 +602,7 @@ class KuwoApi(object, metaclass=Singleton):
         """
         uri = f'http://www.kuwo.cn/comment?type={type_}&f=web&page=${page}&rows=${limit}&digest=${digest_}&sid=${sid}' \
               f'&uid=&prod=newWeb&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri)
 
     def artists_recommend(self, category: int, limit=20, page=1) -> dict:
         """
@@ -450,10 +613,7 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/artist/artistInfo?category={category}&pn={page}&rn={limit}&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri)
 
     def playlist_tags(self) -> dict:
         """
@@ -461,10 +621,7 @@ class KuwoApi(object, metaclass=Singleton):
         :return:
         """
         uri = KuwoApi.API_BASE + f'/playlist/getTagList?&httpsStatus=1'
-        with requests.Session() as session:
-            response = session.get(uri, cookies=self.cookie, headers=self.headers)
-            data = response.json()
-            return data
+        return self._get_json(uri, endpoint='playlist_tags')
 
     @staticmethod
     def write_text_to_example(response: requests.Response, file_name: str):
@@ -0,0 +1,185 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from feeluown.consts import DATA_DIR
+
+RESPONSE_CACHE_FILE = os.path.join(DATA_DIR, 'kuwo_response_cache.sqlite')
+
+
+class CacheStats:
+    """ hit/miss counters of a cache """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio,
+        }
+
+    def __repr__(self):
+        return f'<CacheStats {self.as_dict()}>'
+
+
+class ResponseCache:
+    """ persistent cache of json responses, stored in a SQLite file
+
+    Each entry records the endpoint it belongs to, so that every endpoint
+    has its own time-to-live. Expired entries can still be served for
+    ``max_stale`` seconds while the caller revalidates them. The least
+    recently used entries are evicted when there are more than ``max_entries``.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_FILE, max_entries: int = 10000,
+                 max_stale: int = 7 * 24 * 60 * 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                           'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                           'expired_at REAL NOT NULL, accessed_at REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at '
+                           'ON responses (accessed_at)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Tuple[Any, bool]:
+        """ get a cached value
+
+        :return: (value, fresh). value is None when the key is not cached or
+            when the entry is older than max_stale.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expired_at FROM responses WHERE key=?',
+                                     (key,)).fetchone()
+            if row is None or row[1] + self.max_stale < now:
+                self.stats.misses += 1
+                return None, False
+            self._conn.execute('UPDATE responses SET accessed_at=? WHERE key=?', (now, key))
+            self._conn.commit()
+            fresh = row[1] >= now
+            if fresh:
+                self.stats.hits += 1
+            else:
+                self.stats.stale_hits += 1
+        return json.loads(row[0]), fresh
+
+    def set(self, key: str, value: Any, ttl: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                               (key, json.dumps(value), now + ttl, now))
+            count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            if count > self.max_entries:
+                evicted = count - self.max_entries
+                self._conn.execute('DELETE FROM responses WHERE key IN (SELECT key FROM '
+                                   'responses ORDER BY accessed_at LIMIT ?)', (evicted,))
+                self.stats.evictions += evicted
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class LRUCache:
+    """ thread safe in-memory LRU cache with time-to-live
+
+    Entries are evicted when there are more than ``max_entries`` of them or
+    when their total size, measured by ``sizeof``, exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = sys.getsizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._sizeof = sizeof
+        self._bytes = 0
+        # key -> (value, expired_at, size)
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, Optional[float], int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expired_at = None if ttl is None else time.monotonic() + ttl
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, expired_at, size)
+            self._bytes += size
+            while self._entries and (
+                    len(self._entries) > self.max_entries
+                    or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._pop(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """ total size of the values, only tracked when max_bytes is set """
+        return self._bytes
+
+    def _pop(self, key):
+        value, _, size = self._entries.pop(key)
+        self._bytes -= size
+        return value
+
+    def __len__(self):
+        return len(self._entries)
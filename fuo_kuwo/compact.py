@@ -0,0 +1,83 @@
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from feeluown.library import SongModel
+
+from .schemas import KuwoSongSchema, _Fallback, get_loader
+
+_INT_COLUMNS = ('identifier', 'duration', 'artistid', 'albumid', 'hasmv')
+_STR_COLUMNS = ('title', 'artist', 'album', 'albumpic')
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class SongTable:
+    """Columnar storage of raw song data, SongModel are created on access
+
+    Numbers are stored in arrays and strings are interned per table, so
+    the name of an artist or an album is stored once for the whole table.
+    A row costs a few dozen bytes, instead of a few KB for a SongModel with
+    its brief models and cache entries.
+
+    Songs the fast loader can't convert (see :class:`FastLoader`) are kept
+    as models.
+    """
+
+    def __init__(self):
+        self._ints = {name: array('q') for name in _INT_COLUMNS}
+        self._strs: Dict[str, List[Optional[str]]] = {name: [] for name in _STR_COLUMNS}
+        self._lossless = bytearray()
+        self._strings: Dict[str, str] = {}
+        self._models: Dict[int, SongModel] = {}
+        self._lock = threading.Lock()
+
+    def append(self, data: dict) -> int:
+        """Store the raw song data and return its row
+
+        :raise marshmallow.ValidationError: data is not a valid song
+        """
+        loader = get_loader(KuwoSongSchema)
+        try:
+            values = loader.convert(data)
+            ints = [values.get(name, 0) for name in _INT_COLUMNS]
+            if not all(_INT64_MIN <= value <= _INT64_MAX for value in ints):
+                raise _Fallback
+        except _Fallback:
+            model = loader.load(data)
+            with self._lock:
+                row = self._append_row([0] * len(_INT_COLUMNS), {}, False)
+                self._models[row] = model
+            return row
+        with self._lock:
+            return self._append_row(ints, values, values.get('lossless', False))
+
+    def _append_row(self, ints, values, lossless) -> int:
+        row = len(self._lossless)
+        for name, value in zip(_INT_COLUMNS, ints):
+            self._ints[name].append(value)
+        for name in _STR_COLUMNS:
+            s = values.get(name)
+            if s is not None:
+                s = self._strings.setdefault(s, s)
+            self._strs[name].append(s)
+        self._lossless.append(bool(lossless))
+        return row
+
+    def identifier(self, row: int) -> str:
+        model = self._models.get(row)
+        if model is not None:
+            return model.identifier
+        return str(self._ints['identifier'][row])
+
+    def get(self, row: int) -> SongModel:
+        """Create the SongModel of a row, the same as the schema would"""
+        model = self._models.get(row)
+        if model is not None:
+            return model
+        values = {name: self._ints[name][row] for name in _INT_COLUMNS}
+        values.update((name, self._strs[name][row]) for name in _STR_COLUMNS)
+        values['lossless'] = bool(self._lossless[row])
+        return get_loader(KuwoSongSchema).schema.create_model(values)
+
+    def __len__(self):
+        return len(self._lossless)
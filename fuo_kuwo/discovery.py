@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from functools import partial
+from typing import Dict, List, Optional
+
+from feeluown.consts import DATA_DIR
+from feeluown.excs import ProviderIOError
+
+from .schemas import KuwoArtistSchema, KuwoPlaylistSchema, KuwoSongSchema
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_SNAPSHOT_FILE = os.path.join(DATA_DIR, 'kuwo_discovery_snapshot.json')
+#: artist categories of the discovery page: 11 華語  13 歐美  12 日韓 16 組合
+ARTIST_CATEGORIES = (11, 13, 12, 16)
+_SNAPSHOT_VERSION = 1
+
+
+class Discovery:
+    """Models of the discovery page, deserialized from the raw responses
+
+    Responses without a matching model (banners, rank menus, radios and
+    playlist tags) are kept as they are returned by the API.
+    """
+
+    def __init__(self, responses: Dict[str, dict], fetched_at: float):
+        from .provider import _deserialize_many
+
+        #: raw responses keyed by request name, see :func:`discovery_requests`
+        self.responses = responses
+        #: time the snapshot was fetched at
+        self.fetched_at = fetched_at
+        self.banners: List[dict] = _data(responses, 'banner', list)
+        self.rank_groups: List[dict] = _data(responses, 'rank_index', list)
+        #: top ranks, with their first songs as SongModel in the `songs` key
+        self.top_ranks: List[dict] = []
+        for rank in _data(responses, 'rank_top', list):
+            rank = dict(rank)
+            rank['songs'] = _deserialize_many(rank.pop('musicList', None) or [],
+                                              KuwoSongSchema)
+            self.top_ranks.append(rank)
+        self.playlists = _deserialize_many(
+            _data(responses, 'playlist_recommend', dict).get('list', []), KuwoPlaylistSchema)
+        self.radios: List[dict] = _data(responses, 'radio_list', dict).get('albumList', [])
+        self.playlist_tags: List[dict] = _data(responses, 'playlist_tags', list)
+        #: recommended artists keyed by category, see :data:`ARTIST_CATEGORIES`
+        self.artists = {
+            category: _deserialize_many(
+                _data(responses, f'artists_recommend_{category}', dict).get('artistList', []),
+                KuwoArtistSchema)
+            for category in ARTIST_CATEGORIES
+        }
+
+    def is_stale(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at > ttl
+
+
+class DiscoveryAggregator:
+    """Fetch the discovery page concurrently and keep a snapshot on disk
+
+    The ten requests of the page are sent through the provider thread
+    pool. The raw responses are saved to ``path``, so that the page can
+    be rendered from the last snapshot at startup, while a fresh one is
+    fetched in background once the snapshot is older than ``ttl`` seconds.
+
+    When some requests fail, their previous responses are kept.
+    """
+
+    def __init__(self, provider, path: str = DISCOVERY_SNAPSHOT_FILE,
+                 ttl: float = 30 * 60, timeout: Optional[float] = 10):
+        """
+        :param provider: the kuwo provider
+        :param path: json file of the snapshot
+        :param ttl: seconds a snapshot is fresh
+        :param timeout: seconds to wait for the responses of a refresh
+        """
+        self.provider = provider
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._snapshot: Optional[Discovery] = None
+        self._loaded = False
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[Discovery]:
+        """Return the current snapshot without waiting for the network
+
+        The snapshot is refreshed in background when it is stale. None is
+        returned when there is no snapshot yet, use :meth:`fetch` or wait
+        for :meth:`refresh` then.
+        """
+        snapshot = self._current()
+        if snapshot is None or snapshot.is_stale(self.ttl):
+            self.refresh()
+        return snapshot
+
+    def fetch(self) -> Discovery:
+        """Fetch a fresh snapshot and wait for it
+
+        :raise ProviderIOError: all the requests failed
+        """
+        return self.refresh().result()
+
+    def refresh(self) -> Future:
+        """Fetch a fresh snapshot in background
+
+        :return: a future of the new snapshot. The future of the pending
+            refresh is returned if there is one.
+        """
+        with self._lock:
+            if self._future is not None and not self._future.done():
+                return self._future
+            future = self._future = Future()
+        # The requests are sent through the executor, the refresh itself
+        # waits for them in its own thread not to take a worker.
+        threading.Thread(target=self._refresh, args=(future,),
+                         name='fuo_kuwo_discovery', daemon=True).start()
+        return future
+
+    def _refresh(self, future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            snapshot = self._fetch()
+        except Exception as e:  # noqa
+            future.set_exception(e)
+        else:
+            future.set_result(snapshot)
+
+    def _fetch(self) -> Discovery:
+        executor = self.provider.executor
+        futures = {name: executor.submit(request)
+                   for name, request in discovery_requests(self.provider.api).items()}
+        wait(futures.values(), timeout=self.timeout)
+
+        previous = self._current()
+        responses, failed = {}, []
+        for name, future in futures.items():
+            try:
+                responses[name] = future.result(timeout=0)
+            except Exception as e:  # noqa
+                future.cancel()
+                logger.warning(f'discovery request {name} failed: {e!r}')
+                failed.append(name)
+        if not responses:
+            raise ProviderIOError('all discovery requests failed')
+
+        if previous is not None:
+            for name in failed:
+                if name in previous.responses:
+                    responses[name] = previous.responses[name]
+        snapshot = Discovery(responses, time.time())
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded = True
+        self._save(snapshot)
+        return snapshot
+
+    def _current(self) -> Optional[Discovery]:
+        with self._lock:
+            if not self._loaded:
+                self._snapshot = self._load()
+                self._loaded = True
+            return self._snapshot
+
+    def _load(self) -> Optional[Discovery]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                js = json.load(f)
+            if js.get('version') != _SNAPSHOT_VERSION:
+                return None
+            return Discovery(js['responses'], js['fetched_at'])
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa
+            logger.exception(f'load discovery snapshot from {self.path} failed')
+            return None
+
+    def _save(self, snapshot: Discovery):
+        js = {'version': _SNAPSHOT_VERSION,
+              'fetched_at': snapshot.fetched_at,
+              'responses': snapshot.responses}
+        tmp_path = f'{self.path}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(js, f, ensure_ascii=False)
+            # Replace the snapshot at once, a crash never leaves half of it.
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.exception(f'save discovery snapshot to {self.path} failed')
+
+
+def discovery_requests(api) -> dict:
+    """Requests of the discovery page, keyed by name"""
+    requests = {
+        'banner': api.banner,
+        'rank_top': api.rank_top,
+        'rank_index': api.rank_index,
+        'playlist_recommend': partial(api.playlist_recommend, 20, 1),
+        'radio_list': api.radio_list,
+        'playlist_tags': api.playlist_tags,
+    }
+    for category in ARTIST_CATEGORIES:
+        requests[f'artists_recommend_{category}'] = partial(api.artists_recommend, category)
+    return requests
+
+
+def _data(responses: Dict[str, dict], name: str, type_):
+    data = (responses.get(name) or {}).get('data')
+    return data if isinstance(data, type_) else type_()
@@ -3,6 +3,12 @@
 # in http://www.gnu.org/licenses/gpl-3.0.html
 
 import base64
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
 
 arrayE = [
     31, 0, 1, 2, 3, 4, -1, -1,
@@ -190,7 +196,8 @@ def sub_keys(l, longs, n):
         j += 1
 
 
-def encrypt(msg, key=SECRET_KEY):
+def _encrypt_bitwise(msg, key=SECRET_KEY):
+    # Bit by bit implementation, the table-driven encrypt must match it.
     if isinstance(msg, str):
         msg = msg.encode()
     if isinstance(key, str):
@@ -237,8 +244,164 @@ def encrypt(msg, key=SECRET_KEY):
     return arrByte2
 
 
+# Table-driven DES
+#
+# A permutation maps each input bit to some output bits, so it is the OR of
+# the images of its input bytes. Each table maps a byte value at one byte
+# position to its image, and the S-boxes are combined with the P permutation.
+# All values are unsigned 64 bit integers; bit_transform yields the same bits.
+
+def _byte_tables(arr_int, n, in_bytes):
+    images = [0] * (in_bytes * 8)
+    for i in range(n):
+        if arr_int[i] >= 0:
+            images[arr_int[i]] |= 1 << i
+    tables = []
+    for k in range(in_bytes):
+        table = [0] * 256
+        for v in range(1, 256):
+            low = v & -v
+            table[v] = table[v ^ low] | images[k * 8 + low.bit_length() - 1]
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+def _sp_tables():
+    p = _byte_tables(arrayP, 32, 4)
+    tables = []
+    for j in range(8):
+        table = []
+        for v in range(64):
+            s = matrixNSBox[j][v] << j * 4
+            table.append(p[0][s & 255] | p[1][s >> 8 & 255] |
+                         p[2][s >> 16 & 255] | p[3][s >> 24])
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+_IP_TABLES = _byte_tables(arrayIP, 64, 8)
+_IP_1_TABLES = _byte_tables(arrayIP_1, 64, 8)
+_E_TABLES = _byte_tables(arrayE, 64, 4)
+_SP_TABLES = _sp_tables()
+
+
+def _permute64(tables, l):
+    t0, t1, t2, t3, t4, t5, t6, t7 = tables
+    return (t0[l & 255] | t1[l >> 8 & 255] | t2[l >> 16 & 255] | t3[l >> 24 & 255] |
+            t4[l >> 32 & 255] | t5[l >> 40 & 255] | t6[l >> 48 & 255] | t7[l >> 56])
+
+
+def _des64_fast(keys, l):
+    e0, e1, e2, e3 = _E_TABLES
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SP_TABLES
+    out = _permute64(_IP_TABLES, l)
+    L = out & 0xFFFFFFFF
+    R = out >> 32
+    for k in keys:
+        x = (e0[R & 255] | e1[R >> 8 & 255] | e2[R >> 16 & 255] | e3[R >> 24]) ^ k
+        L, R = R, L ^ (s0[x & 255] | s1[x >> 8 & 255] | s2[x >> 16 & 255] |
+                       s3[x >> 24 & 255] | s4[x >> 32 & 255] | s5[x >> 40 & 255] |
+                       s6[x >> 48 & 255] | s7[x >> 56])
+    return _permute64(_IP_1_TABLES, L << 32 | R)
+
+
+@lru_cache(maxsize=8)
+def _key_schedule(key):
+    longs = [0] * 16
+    sub_keys(int.from_bytes(key[:8], 'little'), longs, 0)
+    return tuple(longs)
+
+
+def encrypt_bytes(msg, key=SECRET_KEY):
+    if isinstance(msg, str):
+        msg = msg.encode()
+    if isinstance(key, str):
+        key = key.encode()
+    assert (isinstance(msg, bytes))
+    assert (isinstance(key, bytes))
+
+    keys = _key_schedule(key)
+    out = bytearray()
+    # The last block holds the remaining bytes, it is encrypted even if empty.
+    for i in range(0, len(msg) + 1, 8):
+        block = int.from_bytes(msg[i:i + 8], 'little')
+        out += _des64_fast(keys, block).to_bytes(8, 'little')
+    return bytes(out)
+
+
+def encrypt(msg, key=SECRET_KEY):
+    return list(encrypt_bytes(msg, key))
+
+
 def base64_encrypt(msg):
-    b1 = encrypt(msg)
-    b2 = bytearray(b1)
-    s = base64.encodebytes(b2)
-    return s.replace(b'\n', b'').decode()
+    return base64.b64encode(encrypt_bytes(msg)).decode()
+
+
+# Batch encryption with NumPy
+#
+# The blocks of all messages are encrypted at once, the tables above are
+# looked up with the bytes of whole uint64 arrays.
+
+_np_tables = None
+# Below this many messages, NumPy overhead outweighs the vectorization.
+NP_MIN_BATCH = 6
+
+
+def _get_np_tables():
+    global _np_tables
+    if _np_tables is None:
+        def to_array(tables):
+            array = np.zeros((len(tables), 256), dtype=np.uint64)
+            for i, table in enumerate(tables):
+                array[i, :len(table)] = table
+            return array
+        _np_tables = tuple(to_array(t) for t in
+                           (_IP_TABLES, _IP_1_TABLES, _E_TABLES, _SP_TABLES))
+    return _np_tables
+
+
+def _np_permute(tables, x):
+    out = tables[0].take(x & np.uint64(255))
+    for k in range(1, len(tables)):
+        out |= tables[k].take((x >> np.uint64(k * 8)) & np.uint64(255))
+    return out
+
+
+def _np_des64(keys, blocks):
+    ip, ip_1, e, sp = _get_np_tables()
+    out = _np_permute(ip, blocks)
+    L = out & np.uint64(0xFFFFFFFF)
+    R = out >> np.uint64(32)
+    for k in keys:
+        x = _np_permute(e, R) ^ np.uint64(k)
+        L, R = R, L ^ _np_permute(sp, x)
+    return _np_permute(ip_1, (L << np.uint64(32)) | R)
+
+
+def encrypt_many(msgs, key=SECRET_KEY):
+    """ encrypt many messages, return the encrypted bytes of each message
+
+    NumPy is used when it is installed and there are at least
+    ``NP_MIN_BATCH`` messages, otherwise messages are encrypted one by one.
+    """
+    msgs = [msg.encode() if isinstance(msg, str) else msg for msg in msgs]
+    if isinstance(key, str):
+        key = key.encode()
+    if np is None or len(msgs) < NP_MIN_BATCH:
+        return [encrypt_bytes(msg, key) for msg in msgs]
+
+    # Pad each message to whole blocks, the last block may be all padding.
+    sizes = [(len(msg) // 8 + 1) * 8 for msg in msgs]
+    data = b''.join(msg.ljust(size, b'\0') for msg, size in zip(msgs, sizes))
+    blocks = np.frombuffer(data, dtype='<u8').astype(np.uint64)
+    out = _np_des64(_key_schedule(key), blocks).astype('<u8').tobytes()
+    result = []
+    offset = 0
+    for size in sizes:
+        result.append(out[offset:offset + size])
+        offset += size
+    return result
+
+
+def base64_encrypt_many(msgs):
+    return [base64.b64encode(b).decode() for b in encrypt_many(msgs)]
@@ -1,30 +1,56 @@
-from fuo_kuwo.utils import unsigned_right_shift
+import base64
+import binascii
+from typing import Union
 
 
 class KwDecrypt:
+    """ XOR + base64 coding used by some kuwo mobi responses
+
+    Data is XORed with the repeated ``CONST_1`` key, then base64 encoded.
+    """
     CONST_1 = b'kwks&@69'
 
     @staticmethod
-    def aba(b_arr: bytes, i: int):
-        i7 = int(((i * 4) + 2) / 3)
-        c_arr = bytes()
-        i8 = 0
-        i9 = 0
-        while i8 < i:
-            i10 = i8 + 1
-            b4 = b_arr[i8]
-            if i10 < i:
-                i2 = i10 + 1
-                b2 = b_arr[i10] & 255
-            else:
-                i2 = i10
-                b2 = 0
-            if i2 < i:
-                i3 = i2 + 1
-                b3 = b_arr[i2] & 255
-            else:
-                i3 = i2
-                b3 = 0
-            i11 = unsigned_right_shift(b4, 2)
-            i12 = ((b4 & 3) << 4) | unsigned_right_shift(b2, 4)
+    def aba(b_arr: bytes, i: int) -> bytes:
+        """ base64 encode the first i bytes of b_arr (with padding) """
+        return base64.b64encode(memoryview(b_arr)[:i])
+
+    @staticmethod
+    def abb(s: Union[str, bytes]) -> bytes:
+        """ base64 decode, the inverse of :meth:`aba`
+
+        :raise ValueError: s is not valid base64
+        """
+        try:
+            return base64.b64decode(s, validate=True)
+        except binascii.Error as e:
+            raise ValueError(str(e)) from e
+
+    @staticmethod
+    def xor(data: bytes, key: bytes = CONST_1) -> bytes:
+        """ XOR data with the repeated key """
+        n = len(data)
+        if n == 0:
+            return b''
+        stream = (key * (n // len(key) + 1))[:n]
+        # XOR all the bytes at once as two big integers.
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(n, 'big')
+
+    @classmethod
+    def encrypt(cls, data: Union[str, bytes]) -> str:
+        if isinstance(data, str):
+            data = data.encode()
+        xored = cls.xor(data)
+        return cls.aba(xored, len(xored)).decode()
+
+    @classmethod
+    def decrypt(cls, text: Union[str, bytes]) -> bytes:
+        """ decrypt a response returned encrypted
 
+        :raise ValueError: text is not valid base64
+        """
+        if isinstance(text, str):
+            text = text.strip()
+        else:
+            text = bytes(text).strip()
+        return cls.xor(cls.abb(text))
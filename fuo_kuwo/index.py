@@ -0,0 +1,224 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from feeluown.consts import DATA_DIR
+from feeluown.library import SearchType
+from marshmallow import fields
+
+from .schemas import (
+    KuwoAlbumSchema, KuwoArtistSchema, KuwoPlaylistSchema, KuwoSongSchema,
+    KuwoUserPlaylistSchema, get_loader, normalize_str,
+)
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # pypinyin is an optional dependency
+    lazy_pinyin = None
+
+LOCAL_INDEX_FILE = os.path.join(DATA_DIR, 'kuwo_local_index.sqlite')
+
+#: indexed schemas and the search type of their models
+INDEXED_SCHEMAS = {
+    KuwoSongSchema: SearchType.so,
+    KuwoAlbumSchema: SearchType.al,
+    KuwoArtistSchema: SearchType.ar,
+    KuwoPlaylistSchema: SearchType.pl,
+    KuwoUserPlaylistSchema: SearchType.pl,
+}
+_SCHEMAS_BY_NAME = {schema.__name__: schema for schema in INDEXED_SCHEMAS}
+_FTS_TABLES = {type_.value: f'{type_.value}_fts' for type_ in set(INDEXED_SCHEMAS.values())}
+
+# CJK names are not separated by spaces, each char is indexed as a word and
+# a name is matched as a phrase of chars.
+_CJK = re.compile('([\u2e80-\u9fff\u3040-\u30ff\uac00-\ud7af\uf900-\ufaff])')
+_WORD = re.compile(r'\w')
+
+
+class LocalIndex:
+    """Full-text index of the models fetched by the provider, stored in SQLite
+
+    Raw data of songs, albums, artists and playlists are added while they
+    are deserialized, and searched by name, artist and album name offline.
+    Names are NFKC-normalized (see :func:`normalize_str`); names in Chinese
+    can also be searched in pinyin when pypinyin is installed.
+
+    Models are written by batches of ``batch_size``, and pending ones are
+    written before a search. The least recently added models are evicted
+    when there are more than ``max_entries`` of them.
+
+    Ranking is the costly part of a query matching many models, so only the
+    ``max_candidates`` most recently added matches are ranked.
+    """
+
+    def __init__(self, path: str = LOCAL_INDEX_FILE, max_entries: int = 1000000,
+                 batch_size: int = 500, max_candidates: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.max_candidates = max_candidates
+        self._pending: Dict[Tuple[str, str], tuple] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                           'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                           'type TEXT NOT NULL, identifier TEXT NOT NULL, '
+                           'schema TEXT NOT NULL, data TEXT NOT NULL, '
+                           'UNIQUE (type, identifier))')
+        # One full-text table per search type, so that a query only reads
+        # the models of its type. The last word of a query is a prefix,
+        # short prefixes are indexed to avoid expanding them on each query.
+        for table in _FTS_TABLES.values():
+            self._conn.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} '
+                               "USING fts5(name, artist, album, pinyin, prefix='2 3')")
+        self._conn.commit()
+        self._count = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def add(self, schema_class, data: dict, model=None):
+        """Add the raw data of a model, models of other schemas are ignored
+
+        :param model: the model of the data, it is created if not given
+        """
+        type_ = INDEXED_SCHEMAS.get(schema_class)
+        if type_ is None or not isinstance(data, dict):
+            return
+        identifier = data.get(_identifier_key(schema_class))
+        if identifier is None:
+            return
+        with self._lock:
+            self._pending[(type_.value, str(identifier))] = (schema_class, data, model)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def search(self, keyword: str, type_=SearchType.so, limit: int = 20) -> list:
+        """Search models of the type by name, the best matches first"""
+        query = _match_query(keyword)
+        if not query:
+            return []
+        table = _FTS_TABLES[SearchType.parse(type_).value]
+        with self._lock:
+            self._flush()
+            rows = self._conn.execute(
+                f'SELECT schema, data FROM (SELECT rowid, rank FROM {table} '
+                f'WHERE {table} MATCH ? ORDER BY rowid DESC LIMIT ?) AS matches '
+                'JOIN entries ON entries.id = matches.rowid ORDER BY matches.rank LIMIT ?',
+                (query, self.max_candidates, limit)).fetchall()
+        return [get_loader(_SCHEMAS_BY_NAME[schema]).load(json.loads(data))
+                for schema, data in rows]
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._conn.execute('DELETE FROM entries')
+            for table in _FTS_TABLES.values():
+                self._conn.execute(f'DELETE FROM {table}')
+            self._conn.commit()
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._count + len(self._pending)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        conn = self._conn
+        for (type_, identifier), (schema_class, data, model) in pending.items():
+            text = json.dumps({key: data[key] for key in _stored_keys(schema_class)
+                               if key in data}, ensure_ascii=False)
+            row = conn.execute('SELECT id, data FROM entries WHERE type = ? AND identifier = ?',
+                               (type_, identifier)).fetchone()
+            if row is not None:
+                if row[1] == text:
+                    continue
+                conn.execute('DELETE FROM entries WHERE id = ?', (row[0],))
+                conn.execute(f'DELETE FROM {_FTS_TABLES[type_]} WHERE rowid = ?', (row[0],))
+                self._count -= 1
+            rowid = conn.execute('INSERT INTO entries (type, identifier, schema, data) '
+                                 'VALUES (?, ?, ?, ?)',
+                                 (type_, identifier, schema_class.__name__, text)).lastrowid
+            if model is None:
+                model = get_loader(schema_class).load(data)
+            conn.execute(f'INSERT INTO {_FTS_TABLES[type_]} '
+                         '(rowid, name, artist, album, pinyin) VALUES (?, ?, ?, ?, ?)',
+                         (rowid, *_model_texts(model)))
+            self._count += 1
+        if self._count > self.max_entries:
+            last = conn.execute('SELECT id FROM entries ORDER BY id LIMIT 1 OFFSET ?',
+                                (self._count - self.max_entries - 1,)).fetchone()[0]
+            conn.execute('DELETE FROM entries WHERE id <= ?', (last,))
+            for table in _FTS_TABLES.values():
+                conn.execute(f'DELETE FROM {table} WHERE rowid <= ?', (last,))
+            self._count = self.max_entries
+        conn.commit()
+
+
+@lru_cache(maxsize=None)
+def _stored_keys(schema_class) -> List[str]:
+    # Nested lists, such as the songs of an album, are not stored.
+    return [field.data_key or name for name, field in schema_class._declared_fields.items()
+            if not isinstance(field, fields.List)]
+
+
+@lru_cache(maxsize=None)
+def _identifier_key(schema_class) -> str:
+    field = schema_class._declared_fields['identifier']
+    return field.data_key or 'identifier'
+
+
+def _tokenize(s: str) -> str:
+    s = normalize_str(s).lower()
+    if s.isascii():
+        return s
+    return _CJK.sub(_spaced, s)
+
+
+def _spaced(match) -> str:
+    return f' {match.group()} '
+
+
+def _model_texts(model) -> Tuple[str, str, str, str]:
+    name = getattr(model, 'title', None) or getattr(model, 'name', '')
+    artist = getattr(model, 'artists_name', '')
+    album = getattr(model, 'album_name', '')
+    return _tokenize(name), _tokenize(artist), _tokenize(album), _pinyin(name, artist)
+
+
+def _pinyin(*names: str) -> str:
+    if lazy_pinyin is None:
+        return ''
+    words = []
+    for name in names:
+        if _CJK.search(name):
+            syllables = lazy_pinyin(normalize_str(name))
+            # Users type the full pinyin or its initials, e.g. zhoujielun or zjl.
+            words.append(''.join(syllables).lower())
+            words.append(''.join(s[:1] for s in syllables).lower())
+    return ' '.join(words)
+
+
+def _match_query(keyword: str) -> Optional[str]:
+    """Build a FTS5 query matching all the words, the last one as a prefix"""
+    phrases = []
+    for word in normalize_str(keyword).lower().split():
+        if _WORD.search(word):
+            tokens = ' '.join(_tokenize(word).split())
+            phrases.append('"{}"'.format(tokens.replace('"', '""')))
+    if not phrases:
+        return None
+    phrases[-1] += '*'
+    return ' AND '.join(phrases)
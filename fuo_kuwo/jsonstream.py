@@ -0,0 +1,156 @@
+import codecs
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class JsonListStream:
+    """Parse a list nested in a json document while the document is received
+
+    ``path`` is the keys leading to the list, e.g. ``('data', 'musicList')``.
+    Items of the list are yielded one by one, so only the current chunk and
+    the item being parsed are kept in memory.
+
+    Fields of the object holding the list are stored in :attr:`fields`. The
+    ones before the list are available once :meth:`open` returns, the ones
+    after it once all the items are read.
+    """
+
+    def __init__(self, chunks: Iterable[Union[str, bytes]], path: Sequence[str],
+                 close: Optional[Callable[[], None]] = None):
+        """
+        :param chunks: the document, as str or utf-8 encoded chunks
+        :param path: keys leading to the list
+        :param close: called once the stream is read or closed
+        """
+        self.path = tuple(path)
+        self.fields: Dict[str, Any] = {}
+        #: number of items read
+        self.count = 0
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._close = close
+        self._text = ''
+        self._pos = 0
+        self._eof = False
+        self._items: Optional[Iterator[Any]] = None
+
+    def open(self) -> 'JsonListStream':
+        """Parse the document until the list starts"""
+        if self._items is None:
+            self._items = self._parse()
+            # The parser pauses once when the list starts (or when the
+            # document ends without the list).
+            next(self._items)
+        return self
+
+    def close(self):
+        self._items = iter(())
+        if self._close is not None:
+            close, self._close = self._close, None
+            close()
+
+    def __iter__(self) -> Iterator[Any]:
+        self.open()
+        try:
+            for item in self._items:
+                self.count += 1
+                yield item
+        finally:
+            self.close()
+
+    def _parse(self):
+        depth = 0
+        found = False
+        self._expect('{')
+        while True:
+            c = self._peek()
+            if c == '}' or c == '':
+                # The object holding the list (or one of its parents) ends.
+                break
+            if c == ',':
+                self._pos += 1
+                continue
+            key = self._value()
+            self._expect(':')
+            if not found and key == self.path[depth]:
+                c = self._peek()
+                if depth + 1 < len(self.path) and c == '{':
+                    self._pos += 1
+                    depth += 1
+                    continue
+                if depth + 1 == len(self.path) and c == '[':
+                    self._pos += 1
+                    found = True
+                    yield
+                    yield from self._list_items()
+                    continue
+            value = self._value()
+            if depth + 1 == len(self.path):
+                self.fields[key] = value
+        if not found:
+            yield
+
+    def _list_items(self):
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            c = self._peek()
+            self._pos += 1
+            if c == ']':
+                return
+            if c != ',':
+                raise ValueError(f'invalid json list, unexpected {c!r}')
+
+    def _expect(self, c: str):
+        if self._peek() != c:
+            raise ValueError(f'invalid json, expect {c!r}')
+        self._pos += 1
+
+    def _peek(self) -> str:
+        """Skip whitespaces and return the next char, '' at the end"""
+        while True:
+            text, pos = self._text, self._pos
+            n = len(text)
+            while pos < n and text[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return text[pos]
+            if not self._fill():
+                return ''
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._text, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may go on in the next chunk.
+            if end < len(self._text) or not self._fill():
+                self._pos = end
+                return value
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping the parsed text"""
+        while not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                chunk = self._utf8.decode(b'', final=True)
+            else:
+                if isinstance(chunk, bytes):
+                    chunk = self._utf8.decode(chunk)
+            if chunk:
+                self._text = self._text[self._pos:] + chunk
+                self._pos = 0
+                return True
+        return False
@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterable, List, Optional
+
+from feeluown.media import Quality
+
+from . import __identifier__
+
+logger = logging.getLogger(__name__)
+
+
+class MediaPrefetcher:
+    """Resolve the media of upcoming songs in background
+
+    Media resolved by the provider are cached on the songs for a limited
+    time (see ``MEDIA_TTL`` in the provider module), so the prefetcher only
+    resolves songs whose media is not cached, or expires within
+    ``refresh_margin`` seconds. When the next song starts, its media url
+    is then usually already there.
+
+    Lq media urls are not cached by the provider, so they are not prefetched.
+    """
+
+    def __init__(self, provider, count: int = 2, refresh_margin: int = 60):
+        """
+        :param provider: the kuwo provider
+        :param count: number of upcoming songs to prefetch
+        :param refresh_margin: seconds before expiration a cached media is refreshed
+        """
+        self.provider = provider
+        self.count = count
+        self.refresh_margin = refresh_margin
+        self._playlist = None
+        self._futures = {}
+        # Futures may run their done callback while the lock is held.
+        self._lock = threading.RLock()
+
+    def schedule(self, songs: Iterable, policy: Optional[str] = None) -> List[Future]:
+        """Prefetch media of the first `count` songs of the upcoming songs
+
+        :param songs: upcoming songs, the next one first
+        :param policy: audio select policy, the one used by the player
+        :return: futures of the newly scheduled prefetches
+        """
+        upcoming = []
+        for song in songs:
+            if len(upcoming) >= self.count:
+                break
+            if song.source == __identifier__:
+                upcoming.append(song)
+
+        scheduled = []
+        with self._lock:
+            keys = {song.identifier for song in upcoming}
+            # Songs which are not upcoming anymore are not worth fetching.
+            for key in [key for key in self._futures if key not in keys]:
+                self._futures.pop(key).cancel()
+            for song in upcoming:
+                if song.identifier not in self._futures:
+                    future = self.provider.executor.submit(self._prefetch, song, policy)
+                    self._futures[song.identifier] = future
+                    future.add_done_callback(
+                        lambda f, key=song.identifier: self._on_done(key, f))
+                    scheduled.append(future)
+        return scheduled
+
+    def watch(self, playlist):
+        """Prefetch the songs after the current song of the playlist"""
+        self.unwatch()
+        self._playlist = playlist
+        playlist.song_changed_v2.connect(self._on_song_changed)
+
+    def unwatch(self):
+        if self._playlist is not None:
+            self._playlist.song_changed_v2.disconnect(self._on_song_changed)
+            self._playlist = None
+
+    def _on_song_changed(self, song, _):
+        playlist = self._playlist
+        if song is None or playlist is None:
+            return
+        songs = playlist.list()
+        try:
+            index = songs.index(song)
+        except ValueError:
+            return
+        self.schedule(songs[index + 1:], playlist.audio_select_policy)
+
+    def _on_done(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def _prefetch(self, song, policy):
+        try:
+            quality = self._select_quality(song, policy)
+            if quality is None or quality == Quality.Audio.lq:
+                return
+            expired_at, exists = song.cache_get(f'media_{quality.value}_expired_at')
+            if exists and expired_at - time.time() > self.refresh_margin:
+                return
+            self.provider.song_fetch_media(song, quality)
+        except Exception:  # noqa
+            logger.exception(f'prefetch media of {song} failed')
+
+    def _select_quality(self, song, policy) -> Optional[Quality.Audio]:
+        # Select quality in the same way as ProviderV2.song_select_media.
+        available = {quality.value for quality in self.provider.song_list_quality(song)}
+        policy = 'hq<>' if policy is None else policy
+        for quality in Quality.SortPolicy.apply(policy, [q.value for q in Quality.Audio]):
+            if quality in available:
+                return Quality.Audio(quality)
+        return None
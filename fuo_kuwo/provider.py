@@ -1,6 +1,11 @@
 import logging
+import sys
+import threading
 import time
-from typing import List
+from concurrent.futures import (
+    FIRST_COMPLETED, ThreadPoolExecutor, wait,
+)
+from typing import Iterable, Iterator, List, Optional, Union
 
 from feeluown.excs import ProviderIOError
 from feeluown.library import (
@@ -17,8 +22,15 @@ from feeluown.utils.reader import SequentialReader
 
 from .schemas import (
     KuwoSongSchema, KuwoAlbumSchema, KuwoArtistSchema, KuwoPlaylistSchema,
-    KuwoUserPlaylistSchema,
+    KuwoUserPlaylistSchema, get_loader,
 )
+from .cache import LRUCache
+from .compact import SongTable
+from .discovery import DiscoveryAggregator
+from .enc.decrypt import KwDecrypt
+from .index import LOCAL_INDEX_FILE, LocalIndex
+from .prefetch import MediaPrefetcher
+from .reader import iter_pages, iter_streams, LazyPageReader, PageReader
 from .utils import parse_lyrics
 from . import __identifier__, __alias__
 from .api import KuwoApi
@@ -27,6 +39,8 @@ logger = logging.getLogger(__name__)
 Audio = Quality.Audio
 Video = Quality.Video
 SOURCE = __identifier__
+#: seconds a resolved media url is cached on its song
+MEDIA_TTL = 60 * 10
 
 
 class KuwoProvider(
@@ -43,10 +57,78 @@ class KuwoProvider(
         identifier: str = __identifier__
         name: str = __alias__
 
+    #: max number of worker threads used for concurrent API calls
+    max_workers = 8
+    #: number of objects per page for paginated readers, kuwo accepts up to 100
+    page_size = 20
+    #: number of pages a sequential reader fetches ahead in the background
+    prefetch_pages = 2
+    #: pages of at least this many objects are parsed while they are received
+    stream_page_size = 100
+    #: limits of the cache of deserialized models, see :attr:`model_cache`
+    model_cache_ttl = 30 * 60
+    model_cache_max_entries = 5000
+    model_cache_max_bytes = 32 * 1024 * 1024
+    #: create random access readers (see :class:`PageReader`) for playlist songs,
+    #: artist songs and artist albums, otherwise sequential readers are created
+    random_access_readers = True
+    #: random access song readers store raw songs compactly, see :class:`SongTable`
+    compact_song_lists = True
+
     def __init__(self):
         super().__init__()
         self.api = KuwoApi()
+        self._async_api = None
         self._user = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        #: deserialized models keyed by (ModelType, identifier). Songs from
+        #: search results, album track lists and playlist readers are shared
+        #: through it, as well as the models returned by the *_get methods.
+        self.model_cache = LRUCache(max_entries=self.model_cache_max_entries,
+                                    max_bytes=self.model_cache_max_bytes,
+                                    ttl=self.model_cache_ttl,
+                                    sizeof=_model_sizeof)
+        self.media_prefetcher = MediaPrefetcher(self)
+        #: discovery page, fetched concurrently and cached on disk
+        self.discovery = DiscoveryAggregator(self)
+        #: full-text index of the fetched models, see :meth:`enable_local_index`
+        self.local_index: Optional[LocalIndex] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """thread pool shared by the concurrent operations of the provider"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers,
+                                                    thread_name_prefix='fuo_kuwo')
+        return self._executor
+
+    def enable_local_index(self, path: str = LOCAL_INDEX_FILE, max_entries: int = 1000000):
+        """Index the fetched songs, albums, artists and playlists on disk
+
+        Searches are then answered from the index, the kuwo search API is
+        only requested when nothing matches locally.
+
+        :param path: SQLite database file
+        :param max_entries: max number of indexed models, the least recently
+            added ones are evicted
+        """
+        self.local_index = LocalIndex(path, max_entries=max_entries)
+
+    def disable_local_index(self):
+        if self.local_index is not None:
+            self.local_index.close()
+            self.local_index = None
+
+    @property
+    def async_api(self):
+        """asyncio twin of :attr:`api`, it requires aiohttp"""
+        if self._async_api is None:
+            from .aio_api import AsyncKuwoApi
+
+            self._async_api = AsyncKuwoApi()
+        return self._async_api
 
     @property
     def user(self):
@@ -73,17 +155,19 @@ class KuwoProvider(
     def current_user_playlists(self):
         data = self.api.get_user_playlists()
         data_playlists = data.get('plist', [])
-        return [_deserialize(data_playlist, KuwoUserPlaylistSchema)
-                for data_playlist in data_playlists]
+        return _deserialize_many(data_playlists, KuwoUserPlaylistSchema)
 
     def rec_list_daily_playlists(self):
         data_playlists = self.api.playlist_recommend(20, 1)
-        return [_deserialize(data_playlist, KuwoPlaylistSchema)
-                for data_playlist in data_playlists.get('data', {}).get('list', [])]
+        return _deserialize_many(data_playlists.get('data', {}).get('list', []),
+                                 KuwoPlaylistSchema)
 
     def song_get(self, identifier):
-        data = self.api.get_song_detail(identifier)
-        return _deserialize(data.get('data'), KuwoSongSchema)
+        song = self.model_cache.get((ModelType.song, str(identifier)))
+        if song is None:
+            data = self.api.get_song_detail(identifier)
+            song = _deserialize(data.get('data'), KuwoSongSchema)
+        return song
 
     def song_list_quality(self, song: BriefSongProtocol) -> List[Audio]:
         has_lossless = self._model_cache_get_or_fetch(song, 'lossless')
@@ -93,54 +177,83 @@ class KuwoProvider(
         return quality_list
 
     def song_get_media(self, song: BriefSongProtocol, quality: Audio):
+        # Lq media urls are not cached.
+        if quality != Audio.lq:
+            media, exists = song.cache_get(f'media_{quality.value}')
+            if exists:
+                return media
+        return self.song_fetch_media(song, quality)
+
+    def song_fetch_media(self, song: BriefSongProtocol, quality: Audio):
+        """Like :meth:`song_get_media`, but always fetch a new media url"""
         quality = quality.value
         if quality == 'lq':
-            js = self.api.get_song_url(song.identifier)
-            data = _get_data_or_raise(js)
-            url = data.get('url', '')
-            if not url:
-                logger.warning("no song url for 'lq' quality")
-                return None
-            return Media(url,
-                         format=KuwoApi.FORMATS_BRS[quality],
-                         bitrate=KuwoApi.FORMATS_RATES[quality] // 1000)
+            return _media_from_url_js(self.api.get_song_url(song.identifier), quality)
+        text = self.api.get_song_url_mobi(song.identifier, quality)
+        return _cache_media_from_mobi_text(song, quality, text)
+
+    def prefetch_media(self, songs: Iterable[BriefSongProtocol], policy: Optional[str] = None):
+        """Resolve the media of upcoming songs in background
+
+        See :class:`~fuo_kuwo.prefetch.MediaPrefetcher` for details.
+        """
+        return self.media_prefetcher.schedule(songs, policy)
+
+    def songs_get_media(self, songs: Iterable[BriefSongProtocol], quality: Audio,
+                        concurrency: Optional[int] = None) -> List[Union[Media, None, Exception]]:
+        """Resolve the media of many songs concurrently
+
+        Resolved media are cached on each song, like :meth:`song_get_media` does.
+
+        :param concurrency: max number of songs resolved at the same time,
+            defaults to :attr:`max_workers`
+        :return: media in the same order as songs. A song which can't be
+            resolved gets None, a song which fails gets the exception.
+        """
+        songs = list(songs)
+        limit = concurrency or self.max_workers
+        results: List[Union[Media, None, Exception]] = [None] * len(songs)
+        pending = {}
+
+        def collect(done):
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:  # noqa
+                    logger.warning(f'get media of song {songs[index]} failed: {e}')
+                    results[index] = e
+
+        for index, song in enumerate(songs):
+            if len(pending) >= limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[self.executor.submit(self.song_get_media, song, quality)] = index
+        collect(wait(pending).done)
+        return results
+
+    async def song_get_media_async(self, song: BriefSongProtocol, quality: Audio):
+        """asyncio version of :meth:`song_get_media`"""
+        quality = quality.value
+        if quality == 'lq':
+            js = await self.async_api.get_song_url(song.identifier)
+            return _media_from_url_js(js, quality)
 
         cache_key = f'media_{quality}'
         media, exists = song.cache_get(cache_key)
         if exists:
             return media
-
-        # Response example::
-        #   format=ape
-        #   bitrate=1000
-        #   url=http://sq.sycdn.kuwo.cn/xx/yy/zz.ape
-        #   sig=1111111111111
-        text = self.api.get_song_url_mobi(song.identifier, quality)
-        media_data = {}
-        for line in text.split():
-            key, value = line.split('=', 1)
-            media_data[key] = value
-        # Check field value before use it since I'm not sure if the field always exists.
-        if not media_data.get('url'):
-            return None
-
-        bitrate = int(media_data.get('bitrate', 0))
-        if bitrate == 0:
-            bitrate = KuwoApi.FORMATS_RATES[quality] // 1000
-        media = Media(media_data['url'],
-                      format=KuwoApi.FORMATS_BRS[quality],
-                      bitrate=bitrate)
-        song.cache_set(cache_key, media, ttl=int(time.time()) + 60 * 10)
-        return media
+        text = await self.async_api.get_song_url_mobi(song.identifier, quality)
+        return _cache_media_from_mobi_text(song, quality, text)
 
     def song_get_lyric(self, song):
         data = self.api.get_song_lyrics(song.identifier)
-        lyrics: list = data.get('data', {}).get('lrclist', [])
-        return LyricModel(
-            source=__identifier__,
-            identifier=song.identifier,
-            content=parse_lyrics(lyrics) or '',
-        )
+        return _lyric_from_js(song, data)
+
+    async def song_get_lyric_async(self, song):
+        """asyncio version of :meth:`song_get_lyric`"""
+        data = await self.async_api.get_song_lyrics(song.identifier)
+        return _lyric_from_js(song, data)
 
     def song_get_mv(self, song):
         hasmv = self._model_cache_get_or_fetch(song, 'hasmv')
@@ -169,35 +282,57 @@ class KuwoProvider(
         return Media(url, MediaType.video)
 
     def album_get(self, identifier):
-        data_album = self.api.get_album_info(identifier)
-        return _deserialize(data_album['data'], KuwoAlbumSchema)
+        key = (ModelType.album, str(identifier))
+        album = self.model_cache.get(key)
+        if album is None:
+            data_album = self.api.get_album_info(identifier)
+            album = _deserialize(data_album['data'], KuwoAlbumSchema)
+            self.model_cache.set(key, album)
+        return album
 
     def album_create_songs_rd(self, album: BriefAlbumProtocol):
-        u_album = self.album_get(album.identifier)
-        return u_album.songs
+        # album_get only has the first page of the songs, the reader
+        # fetches the other pages using the total of the album info.
+        return self._create_rd(self.api.get_album_info, album.identifier,
+                               KuwoSongSchema, 'musicList')
 
     def artist_get(self, identifier):
-        data = self.api.get_artist_info(identifier)
-        return _deserialize(data['data'], KuwoArtistSchema)
+        key = (ModelType.artist, str(identifier))
+        artist = self.model_cache.get(key)
+        if artist is None:
+            data = self.api.get_artist_info(identifier)
+            artist = _deserialize(data['data'], KuwoArtistSchema)
+            self.model_cache.set(key, artist)
+        return artist
 
     def artist_create_songs_rd(self, artist: BriefArtistProtocol):
-        return create_g(self.api.get_artist_songs, artist.identifier, KuwoSongSchema)
+        return self._create_rd(self.api.get_artist_songs, artist.identifier, KuwoSongSchema)
 
     def artist_create_albums_rd(self, artist: BriefArtistProtocol):
-        return create_g(self.api.get_artist_albums,
-                        artist.identifier,
-                        KuwoAlbumSchema,
-                        'albumList')
+        return self._create_rd(self.api.get_artist_albums,
+                               artist.identifier,
+                               KuwoAlbumSchema,
+                               'albumList')
 
     def playlist_get(self, identifier):
-        data_album = self.api.get_playlist_info(identifier)
-        return _deserialize(data_album['data'], KuwoPlaylistSchema)
+        key = (ModelType.playlist, str(identifier))
+        playlist = self.model_cache.get(key)
+        if playlist is None:
+            data_album = self.api.get_playlist_info(identifier)
+            playlist = _deserialize(data_album['data'], KuwoPlaylistSchema)
+            self.model_cache.set(key, playlist)
+        return playlist
 
     def playlist_create_songs_rd(self, playlist):
-        return create_g(self.api.get_playlist_info,
-                        playlist.identifier,
-                        KuwoSongSchema,
-                        list_key='musicList')
+        return self._create_rd(self.api.get_playlist_info,
+                               playlist.identifier,
+                               KuwoSongSchema,
+                               list_key='musicList')
+
+    def _create_rd(self, func, identifier, schema, list_key='list'):
+        if self.random_access_readers:
+            return create_random_reader(func, identifier, schema, list_key)
+        return create_g(func, identifier, schema, list_key)
 
     def search(self, keyword: str, **kwargs) -> SimpleSearchResult:
         type_ = SearchType.parse(kwargs['type_'])
@@ -211,28 +346,244 @@ class KuwoProvider(
             return search_playlist(keyword)
         return None
 
-
-def create_g(func, identifier, schema, list_key='list'):
-    data = func(identifier, page=1).get('data')
+    def search_create_rd(self, keyword: str, type_, page_size: Optional[int] = None):
+        """Create a reader of all the search results of a type
+
+        :meth:`search` only returns the first page, since SimpleSearchResult
+        holds lists. The reader fetches the next pages on demand, prefetches
+        them in background and skips results already read on a previous page.
+        """
+        type_ = SearchType.parse(type_)
+        if type_ not in _SEARCH_SPECS:
+            return SequentialReader(iter(()), 0)
+        api_method, list_key, schema, _ = _SEARCH_SPECS[type_]
+        return create_g(getattr(self.api, api_method), keyword, schema, list_key,
+                        page_size=page_size, unique=True)
+
+    def search_all(self, keyword: str,
+                   type_in: Optional[Iterable[SearchType]] = None,
+                   timeout: Optional[float] = 10) -> SimpleSearchResult:
+        """Search songs, albums, artists and playlists concurrently
+
+        :param type_in: search types, defaults to all supported types
+        :param timeout: seconds to wait for each type, a type which does not
+            respond in time is left empty instead of blocking the others
+        :return: one merged search result
+        """
+        result = SimpleSearchResult(q=keyword)
+        for result in self.search_all_iter(keyword, type_in, timeout):
+            pass
+        return result
+
+    def search_all_iter(self, keyword: str,
+                        type_in: Optional[Iterable[SearchType]] = None,
+                        timeout: Optional[float] = 10) -> Iterator[SimpleSearchResult]:
+        """Like :meth:`search_all`, but yield the merged result every time a
+        search type finishes, so that the caller can render results early.
+
+        The timeout of each type runs from its submission, the time spent by
+        the caller between two results does not count. A type which misses
+        it is skipped, but its request is not cancelled once running: it
+        goes on in the executor until it completes.
+        """
+        types = [SearchType.parse(t) for t in (type_in or _SEARCH_SPECS)]
+        futures = {}
+        for type_ in types:
+            if type_ in _SEARCH_SPECS:
+                future = self.executor.submit(_timed, _SEARCH_FUNCS[type_], keyword)
+                deadline = None if timeout is None else time.monotonic() + timeout
+                futures[future] = (type_, deadline)
+        merged = {}
+        pending = set(futures)
+        while pending:
+            wait_timeout = None
+            if timeout is not None:
+                deadline = min(futures[future][1] for future in pending)
+                wait_timeout = max(0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                type_, deadline = futures[future]
+                try:
+                    part, finished_at = future.result()
+                except Exception:  # noqa
+                    logger.exception(f"search {type_.value} with '{keyword}' failed")
+                    continue
+                if deadline is not None and finished_at > deadline:
+                    logger.warning(f"search {type_.value} with '{keyword}' timed out")
+                    continue
+                field = _SEARCH_SPECS[type_][3]
+                merged[field] = getattr(part, field)
+                yield SimpleSearchResult(q=keyword, **merged)
+            if timeout is None:
+                continue
+            now = time.monotonic()
+            for future in [f for f in pending if not f.done() and futures[f][1] <= now]:
+                pending.discard(future)
+                # Only a queued search is cancelled, a running one is not.
+                future.cancel()
+                logger.warning(f"search {futures[future][0].value} with '{keyword}' timed out")
+
+    async def search_async(self, keyword: str, **kwargs) -> SimpleSearchResult:
+        """asyncio version of :meth:`search`"""
+        type_ = SearchType.parse(kwargs['type_'])
+        if type_ not in _SEARCH_SPECS:
+            return None
+        api_method = getattr(self.async_api, _SEARCH_SPECS[type_][0])
+        return _search_result(keyword, type_, await api_method(keyword))
+
+
+def create_g(func, identifier, schema, list_key='list', page_size=None, prefetch=None,
+             stream=None, unique=False):
+    """Create a sequential reader for a paginated list API
+
+    :param page_size: defaults to :attr:`KuwoProvider.page_size`
+    :param prefetch: number of pages to read ahead in background,
+        defaults to :attr:`KuwoProvider.prefetch_pages`
+    :param stream: parse pages while they are received, func must accept
+        ``stream=True``. Defaults to True for pages of at least
+        :attr:`KuwoProvider.stream_page_size` objects.
+    :param unique: skip objects whose identifier is already read. Results of
+        some APIs shift between two page requests, so an object may show up
+        on two pages. The reader count is then an upper bound.
+    """
+    page_size = page_size or provider.page_size
+    if prefetch is None:
+        prefetch = provider.prefetch_pages
+    if stream is None:
+        stream = page_size >= provider.stream_page_size
+    if stream:
+        reader = _create_stream_g(func, identifier, schema, page_size, prefetch)
+    else:
+        reader = _create_page_g(func, identifier, schema, list_key, page_size, prefetch)
+    if unique:
+        return SequentialReader(_unique(reader), reader.count)
+    return reader
+
+
+def _unique(objs):
+    seen = set()
+    for obj in objs:
+        if obj.identifier not in seen:
+            seen.add(obj.identifier)
+            yield obj
+
+
+def _create_page_g(func, identifier, schema, list_key, page_size, prefetch):
+    data = func(identifier, limit=page_size, page=1).get('data')
     total = int(data['total'])
 
+    def fetch(page):
+        return func(identifier, limit=page_size, page=page).get('data', {})
+
     def g():
-        nonlocal data
         if data is None:
             yield from ()
         else:
-            page = 1
-            while data[list_key]:
-                obj_data_list = data[list_key]
-                for obj_data in obj_data_list:
+            page_count = (total + page_size - 1) // page_size
+            for page_data in iter_pages(fetch, data, list_key, page_count,
+                                        prefetch, provider.executor):
+                for obj_data in page_data[list_key]:
                     obj = _deserialize(obj_data, schema, gotten=True)
                     yield obj
-                page += 1
-                data = func(identifier, page=page).get('data', {})
 
     return SequentialReader(g(), total)
 
 
+def _create_stream_g(func, identifier, schema, page_size, prefetch):
+    def fetch(page):
+        return func(identifier, limit=page_size, page=page, stream=True).open()
+
+    first = fetch(1)
+    if 'total' not in first.fields:
+        first.close()
+        return SequentialReader(iter(()), 0)
+    total = int(first.fields['total'])
+
+    def g():
+        page_count = (total + page_size - 1) // page_size
+        objs = iter_streams(fetch, first, page_count, prefetch, provider.executor)
+        for i, obj_data in enumerate(objs, 1):
+            obj = _deserialize(obj_data, schema, gotten=True)
+            if i == total:
+                # The reader won't ask for more, release the connection now.
+                objs.close()
+            yield obj
+
+    return SequentialReader(g(), total)
+
+
+def create_random_reader(func, identifier, schema, list_key='list', page_size=None,
+                         prefetch=None, stream=None, compact=None):
+    """Create a random access reader for a paginated list API
+
+    Arguments are the same as :func:`create_g`.
+
+    :param compact: store songs in a :class:`SongTable` and create their
+        models when they are read, defaults to
+        :attr:`KuwoProvider.compact_song_lists`
+    """
+    page_size = page_size or provider.page_size
+    if prefetch is None:
+        prefetch = provider.prefetch_pages
+    if stream is None:
+        stream = page_size >= provider.stream_page_size
+    if compact is None:
+        compact = provider.compact_song_lists
+    table = SongTable() if compact and schema is KuwoSongSchema else None
+
+    def fetch_page(page, data=None):
+        if stream:
+            if data is None:
+                data = func(identifier, limit=page_size, page=page, stream=True)
+            objs = data
+        else:
+            if data is None:
+                data = func(identifier, limit=page_size, page=page).get('data') or {}
+            objs = data.get(list_key) or []
+        if table is not None:
+            rows = []
+            for obj_data in objs:
+                rows.append(table.append(obj_data))
+                # Models are created on read, the index creates its own.
+                if provider.local_index is not None:
+                    provider.local_index.add(schema, obj_data)
+            return rows
+        return _deserialize_many(objs, schema)
+
+    if stream:
+        data = func(identifier, limit=page_size, page=1, stream=True).open()
+        total = data.fields.get('total')
+    else:
+        data = func(identifier, limit=page_size, page=1).get('data')
+        total = data['total'] if data else None
+    if total is None:
+        if stream:
+            data.close()
+        return SequentialReader(iter(()), 0)
+    # Leave half of the workers to other requests, such as searches, while
+    # a long list is read.
+    concurrency = max(1, provider.max_workers // 2)
+    if table is not None:
+        return LazyPageReader(int(total), fetch_page, page_size, provider.executor,
+                              lambda row: _song_from_table(table, row),
+                              first_page=fetch_page(1, data), prefetch=prefetch,
+                              concurrency=concurrency)
+    return PageReader(int(total), fetch_page, page_size, provider.executor,
+                      first_page=fetch_page(1, data), prefetch=prefetch,
+                      concurrency=concurrency)
+
+
+def _song_from_table(table, row):
+    # Share the songs through the model cache, as _deserialize does.
+    key = (ModelType.song, table.identifier(row))
+    song = provider.model_cache.get(key)
+    if song is None:
+        song = table.get(row)
+        provider.model_cache.set(key, song)
+    return song
+
+
 def _deserialize(data, schema_class, gotten=True):
     """ deserialize schema data to model
 
@@ -241,11 +592,42 @@ def _deserialize(data, schema_class, gotten=True):
     :param gotten:
     :return:
     """
-    schema = schema_class()
-    obj = schema.load(data)
+    # Songs are complete whichever API they come from, so they can be
+    # shared through the model cache. Albums, artists and playlists from
+    # lists lack fields (songs, description...) and are not shared.
+    key = None
+    if schema_class is KuwoSongSchema and data and data.get('rid') is not None:
+        key = (ModelType.song, str(data['rid']))
+        obj = provider.model_cache.get(key)
+        if obj is not None:
+            return obj
+    obj = get_loader(schema_class).load(data)
+    if key is not None:
+        provider.model_cache.set(key, obj)
+    if provider.local_index is not None:
+        provider.local_index.add(schema_class, data, obj)
     return obj
 
 
+def _deserialize_many(items, schema_class):
+    """ deserialize a list of schema data, see :func:`_deserialize` """
+    if schema_class is KuwoSongSchema:
+        # Songs go one by one through the model cache.
+        return [_deserialize(item, schema_class) for item in items]
+    # Items may be a stream, which can only be read once.
+    items = list(items)
+    objs = get_loader(schema_class).load(items, many=True)
+    if provider.local_index is not None:
+        for item, obj in zip(items, objs):
+            provider.local_index.add(schema_class, item, obj)
+    return objs
+
+
+def _model_sizeof(model):
+    """Roughly estimate the memory used by a model"""
+    return sys.getsizeof(model) + sum(sys.getsizeof(v) for v in model.__dict__.values())
+
+
 def _get_data_or_raise(js):
     """Get data from response json"""
     data = js.get('data')
@@ -254,40 +636,109 @@ def _get_data_or_raise(js):
     return data
 
 
+def _media_from_url_js(js, quality):
+    data = _get_data_or_raise(js)
+    url = data.get('url', '')
+    if not url:
+        logger.warning(f"no song url for '{quality}' quality")
+        return None
+    return Media(url,
+                 format=KuwoApi.FORMATS_BRS[quality],
+                 bitrate=KuwoApi.FORMATS_RATES[quality] // 1000)
+
+
+def _cache_media_from_mobi_text(song, quality, text):
+    # Response example::
+    #   format=ape
+    #   bitrate=1000
+    #   url=http://sq.sycdn.kuwo.cn/xx/yy/zz.ape
+    #   sig=1111111111111
+    # Some responses are returned encrypted.
+    if 'url=' not in text:
+        try:
+            text = KwDecrypt.decrypt(text).decode('utf-8')
+        except ValueError:
+            return None
+    media_data = {}
+    for line in text.split():
+        key, value = line.split('=', 1)
+        media_data[key] = value
+    # Check field value before use it since I'm not sure if the field always exists.
+    if not media_data.get('url'):
+        return None
+
+    bitrate = int(media_data.get('bitrate', 0))
+    if bitrate == 0:
+        bitrate = KuwoApi.FORMATS_RATES[quality] // 1000
+    media = Media(media_data['url'],
+                  format=KuwoApi.FORMATS_BRS[quality],
+                  bitrate=bitrate)
+    # The expiration time lets MediaPrefetcher refresh media about to expire.
+    song.cache_set(f'media_{quality}', media, ttl=MEDIA_TTL)
+    song.cache_set(f'media_{quality}_expired_at', time.time() + MEDIA_TTL, ttl=MEDIA_TTL)
+    return media
+
+
+def _lyric_from_js(song, js):
+    lyrics: list = js.get('data', {}).get('lrclist', [])
+    return LyricModel(
+        source=__identifier__,
+        identifier=song.identifier,
+        content=parse_lyrics(lyrics) or '',
+    )
+
+
+# search type -> (KuwoApi method, list key, schema, SimpleSearchResult field)
+_SEARCH_SPECS = {
+    SearchType.so: ('search', 'list', KuwoSongSchema, 'songs'),
+    SearchType.al: ('search_album', 'albumList', KuwoAlbumSchema, 'albums'),
+    SearchType.ar: ('search_artist', 'artistList', KuwoArtistSchema, 'artists'),
+    SearchType.pl: ('search_playlist', 'list', KuwoPlaylistSchema, 'playlists'),
+}
+
+
+def _search_result(keyword: str, type_: SearchType, js: dict) -> SimpleSearchResult:
+    _, list_key, schema, field = _SEARCH_SPECS[type_]
+    objs = _deserialize_many(js.get('data', {}).get(list_key, []), schema)
+    return SimpleSearchResult(q=keyword, **{field: objs})
+
+
+def _search(keyword: str, type_: SearchType) -> SimpleSearchResult:
+    api_method, _, _, field = _SEARCH_SPECS[type_]
+    if provider.local_index is not None:
+        objs = provider.local_index.search(keyword, type_)
+        if objs:
+            return SimpleSearchResult(q=keyword, **{field: objs})
+    return _search_result(keyword, type_, getattr(provider.api, api_method)(keyword))
+
+
+def _timed(func, *args):
+    """Call func and return its result with the time it finished at"""
+    return func(*args), time.monotonic()
+
+
 def search_song(keyword: str):
-    data_songs = provider.api.search(keyword)
-    songs = []
-    for data_song in data_songs.get('data', {}).get('list', []):
-        song = _deserialize(data_song, KuwoSongSchema)
-        songs.append(song)
-    return SimpleSearchResult(q=keyword, songs=songs)
+    return _search(keyword, SearchType.so)
 
 
 def search_album(keyword: str):
-    data_albums = provider.api.search_album(keyword)
-    albums = []
-    for data_album in data_albums.get('data', {}).get('albumList', []):
-        album = _deserialize(data_album, KuwoAlbumSchema)
-        albums.append(album)
-    return SimpleSearchResult(q=keyword, albums=albums)
+    return _search(keyword, SearchType.al)
 
 
 def search_artist(keyword: str):
-    data_artists = provider.api.search_artist(keyword)
-    artists = []
-    for data_artist in data_artists.get('data', {}).get('artistList', []):
-        artist = _deserialize(data_artist, KuwoArtistSchema)
-        artists.append(artist)
-    return SimpleSearchResult(q=keyword, artists=artists)
+    return _search(keyword, SearchType.ar)
 
 
 def search_playlist(keyword: str):
-    data_playlists = provider.api.search_playlist(keyword)
-    playlists = []
-    for data_playlist in data_playlists.get('data', {}).get('list', []):
-        playlist = _deserialize(data_playlist, KuwoPlaylistSchema)
-        playlists.append(playlist)
-    return SimpleSearchResult(q=keyword, playlists=playlists)
+    return _search(keyword, SearchType.pl)
+
+
+_SEARCH_FUNCS = {
+    SearchType.so: search_song,
+    SearchType.al: search_album,
+    SearchType.ar: search_artist,
+    SearchType.pl: search_playlist,
+}
 
 
 provider = KuwoProvider()
@@ -0,0 +1,292 @@
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar, cast
+
+from feeluown.utils.reader import RandomSequentialReader
+
+T = TypeVar('T')
+
+
+def iter_pages(fetch: Callable[[int], dict],
+               first: dict,
+               list_key: str,
+               page_count: Optional[int] = None,
+               prefetch: int = 0,
+               executor: Optional[Executor] = None) -> Iterator[dict]:
+    """Iterate page data, starting with the already fetched first page
+
+    Iteration stops at the first page whose ``list_key`` list is empty.
+
+    :param fetch: fetch(page) -> page data, page starts from 1
+    :param first: data of page 1
+    :param list_key: key of the object list in page data
+    :param page_count: number of pages, unknown when it is None
+    :param prefetch: number of pages to fetch in background while the
+        caller consumes the current page. At most ``prefetch`` pages are
+        buffered, so memory stays capped.
+    :param executor: executor used to prefetch pages
+    """
+    if prefetch <= 0 or executor is None or page_count is None:
+        data, page = first, 1
+        while data and data.get(list_key):
+            yield data
+            page += 1
+            data = fetch(page)
+        return
+
+    pending = deque()
+    next_page = 2
+    try:
+        data = first
+        while data and data.get(list_key):
+            while len(pending) < prefetch and next_page <= page_count:
+                pending.append(executor.submit(fetch, next_page))
+                next_page += 1
+            yield data
+            if not pending:
+                break
+            data = pending.popleft().result()
+    finally:
+        # The caller may stop reading at any time, drop the pages it won't read.
+        for future in pending:
+            future.cancel()
+
+
+def iter_streams(fetch: Callable[[int], Iterable[T]],
+                 first: Iterable[T],
+                 page_count: int,
+                 prefetch: int = 0,
+                 executor: Optional[Executor] = None) -> Iterator[T]:
+    """Iterate the objects of streamed pages, see :class:`JsonListStream`
+
+    Objects are yielded while a page is received. Iteration stops after a
+    page without objects.
+
+    :param fetch: fetch(page) -> opened stream of the page, page starts from 1
+    :param first: opened stream of page 1
+    :param page_count: number of pages
+    :param prefetch: number of pages to request in background. They are only
+        opened, the rest of their response waits in the socket buffers until
+        the caller reaches them.
+    :param executor: executor used to prefetch pages
+    """
+    pending: Deque[Future] = deque()
+    next_page = 2
+    stream = first
+    try:
+        while True:
+            while (executor is not None and len(pending) < prefetch
+                   and next_page <= page_count):
+                pending.append(executor.submit(fetch, next_page))
+                next_page += 1
+            count = 0
+            for obj in stream:
+                count += 1
+                yield obj
+            if count == 0:
+                break
+            if pending:
+                stream = pending.popleft().result()
+            elif next_page <= page_count:
+                stream = fetch(next_page)
+                next_page += 1
+            else:
+                break
+    finally:
+        stream.close()
+        for future in pending:
+            _close_later(future)
+
+
+class PageReader(RandomSequentialReader):
+    """Random access reader for a paginated API whose total is known
+
+    Any range can be read on demand, the pages covering it are fetched in
+    parallel, so reading a far index or :meth:`readall` costs one parallel
+    burst instead of one request per page. When pages are read in order,
+    the next ``prefetch`` pages are fetched in background.
+
+    Pages may hold less objects than the total promises. An empty page
+    ends the list, and so does a short last page. The objects of a short
+    page in the middle are followed by the ones of the next page, so the
+    count shrinks but no object is lost.
+    """
+
+    def __init__(self,
+                 count: int,
+                 fetch_page: Callable[[int], List[T]],
+                 page_size: int,
+                 executor: Executor,
+                 first_page: Optional[List[T]] = None,
+                 prefetch: int = 0,
+                 concurrency: int = 4):
+        """
+        :param count: total number of objects, at most
+        :param fetch_page: fetch_page(page) -> objects of the page, page starts from 1
+        :param page_size: number of objects per page
+        :param executor: executor used to fetch pages concurrently
+        :param first_page: objects of page 1, if it is already fetched
+        :param prefetch: number of pages to read ahead
+        :param concurrency: max number of pages fetched at the same time, so
+            that reading a long list does not hold the whole executor
+        """
+        super().__init__(count, self._read_pages, max_per_read=page_size)
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._executor = executor
+        self._prefetch = prefetch
+        self._concurrency = concurrency
+        self._pending: Dict[int, Future] = {}
+        self._total = count
+        self._page_count = (count + page_size - 1) // page_size
+        #: objects of the fetched pages
+        self._pages: Dict[int, List[T]] = {}
+        #: index of the first object of each page, pages start from 1
+        self._starts = [i * page_size for i in range(self._page_count)]
+        if first_page is not None:
+            self._store(1, first_page)
+            self._refresh_ranges()
+
+    def readall(self) -> List[T]:
+        missing = self._unread_pages(1, self._page_count)
+        while missing:
+            for page, objs in zip(missing, self._fetch_pages(missing)):
+                self._store(page, objs)
+            missing = self._unread_pages(1, self._page_count)
+        self._refresh_ranges()
+        return cast(List[T], self._objects)
+
+    def _read_next(self):
+        try:
+            return super()._read_next()
+        except IndexError:
+            # The list ended before the offset.
+            raise StopIteration
+
+    def _read_pages(self, start: int, end: int) -> List[T]:
+        last = 0
+        # Short pages shift the objects after them, the range may then
+        # hold objects of pages which are not fetched yet.
+        while True:
+            end = min(end, self._count)
+            if start >= end:
+                break
+            first, last = self._page_of(start), self._page_of(end - 1)
+            pages = self._unread_pages(first, last)
+            if not pages:
+                break
+            # Keep the whole pages, not only the requested range.
+            for page, objs in zip(pages, self._fetch_pages(pages)):
+                self._store(page, objs)
+        if last:
+            self._read_ahead(last + 1)
+        return cast(List[T], self._objects[start:end])
+
+    def _page_of(self, index: int) -> int:
+        return bisect_right(self._starts, index)
+
+    def _unread_pages(self, first: int, last: int) -> List[int]:
+        return [page for page in range(first, min(last, self._page_count) + 1)
+                if page not in self._pages]
+
+    def _expected(self, page: int) -> int:
+        return min(self._page_size, self._total - (page - 1) * self._page_size)
+
+    def _store(self, page: int, objs: List[T]):
+        if page > self._page_count or page in self._pages:
+            return
+        objs = objs[:self._expected(page)]
+        self._pages[page] = objs
+        if not objs:
+            # The list ends before this page.
+            self._page_count = page - 1
+            for p in [p for p in self._pages if p > self._page_count]:
+                del self._pages[p]
+            for p in [p for p in self._pending if p > self._page_count]:
+                self._pending.pop(p).cancel()
+            self._layout()
+        elif len(objs) < self._expected(page):
+            self._layout()
+        else:
+            start = self._starts[page - 1]
+            self._objects[start:start + len(objs)] = objs
+
+    def _layout(self):
+        objects: List[Optional[T]] = []
+        starts = []
+        for page in range(1, self._page_count + 1):
+            starts.append(len(objects))
+            objs = self._pages.get(page)
+            objects.extend(objs if objs is not None else [None] * self._expected(page))
+        self._objects = objects
+        self._starts = starts
+        self._count = len(objects)
+        self._refresh_ranges()
+
+    def _fetch_pages(self, pages: List[int]) -> List[List[T]]:
+        if len(pages) == 1 and pages[0] not in self._pending:
+            return [self._fetch_page(pages[0])]
+        futures: Deque[Future] = deque()
+        page_objs = []
+        for page in pages:
+            if len(futures) >= self._concurrency:
+                page_objs.append(futures.popleft().result())
+            future = self._pending.pop(page, None)
+            if future is None:
+                future = self._executor.submit(self._fetch_page, page)
+            futures.append(future)
+        page_objs.extend(future.result() for future in futures)
+        return page_objs
+
+    def _read_ahead(self, page: int):
+        window = range(page, min(page + self._prefetch, self._page_count + 1))
+        # Keep at most `prefetch` pages buffered, drop the ones out of the window.
+        for stale in [p for p in self._pending if p not in window]:
+            self._pending.pop(stale).cancel()
+        for page in window:
+            if page not in self._pending and page not in self._pages:
+                self._pending[page] = self._executor.submit(self._fetch_page, page)
+
+
+class LazyPageReader(PageReader):
+    """PageReader which stores compact rows and creates objects on read
+
+    ``fetch_page`` returns rows, such as the row numbers of a
+    :class:`SongTable`, and ``materialize(row)`` creates the object of a row.
+    """
+
+    def __init__(self,
+                 count: int,
+                 fetch_page: Callable[[int], List[Any]],
+                 page_size: int,
+                 executor: Executor,
+                 materialize: Callable[[Any], T],
+                 first_page: Optional[List[Any]] = None,
+                 prefetch: int = 0,
+                 concurrency: int = 4):
+        super().__init__(count, fetch_page, page_size, executor,
+                         first_page=first_page, prefetch=prefetch, concurrency=concurrency)
+        self._materialize = materialize
+
+    def read(self, index) -> T:
+        return self._materialize(super().read(index))
+
+    def read_range(self, start: int, end: int) -> List[T]:
+        return [self._materialize(row) for row in super().read_range(start, end)]
+
+    def readall(self) -> List[T]:
+        return [self._materialize(row) for row in super().readall()]
+
+
+def _close_later(future: Future):
+    # Release the connection of a stream the caller won't read.
+    if not future.cancel():
+        future.add_done_callback(
+            lambda f: f.exception() is None and f.result().close())
+
+
+def _done_future(result) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
@@ -1,7 +1,9 @@
 import unicodedata
 import html
+from functools import lru_cache
+from weakref import WeakValueDictionary
 
-from marshmallow import Schema, fields, post_load, EXCLUDE
+from marshmallow import Schema, fields, missing, post_load, EXCLUDE
 from feeluown.library import (
     SongModel, BriefAlbumModel, BriefArtistModel,
     AlbumModel, ArtistModel, PlaylistModel, BriefPlaylistModel,
@@ -10,21 +12,62 @@ from feeluown.library import (
 SOURCE = 'kuwo'
 
 
+#: strings longer than this (descriptions...) are rarely repeated, not cached
+NORMALIZE_CACHE_MAX_LEN = 256
+
+
 def normalize_str(s):
     # String returned from kuwo server may contain charactor
     # which is supposed to normalized.
     #
     # For example, there may be '&nbsp' in album name, which is
     # expected to normalized to whitespace.
+    #
+    # There is nothing to unescape without '&', and most strings (all the
+    # ASCII ones) are NFKC normalized already.
+    if '&' not in s and (s.isascii() or unicodedata.is_normalized('NFKC', s)):
+        return s
+    if len(s) > NORMALIZE_CACHE_MAX_LEN:
+        return _normalize_str(s)
+    # Names repeat a lot across pages, they are normalized once.
+    return _normalize_str_cached(s)
+
+
+def _normalize_str(s):
     return unicodedata.normalize('NFKC', html.unescape(s))
 
 
+_normalize_str_cached = lru_cache(maxsize=4096)(_normalize_str)
+
+
+def normalize_cache_info():
+    """ hits, misses, maxsize and currsize of the normalized strings cache """
+    return _normalize_str_cached.cache_info()
+
+
 def normalize_field(s):
     if s is None:
         return ''
     return normalize_str(s)
 
 
+_brief_models = WeakValueDictionary()  # (model class, identifier, name) -> model
+
+
+def shared_brief_model(model_class, identifier, name):
+    """ get the brief model shared by all the models referring to it
+
+    Songs of an album or an artist refer to the same brief album/artist,
+    one instance is kept as long as some model refers to it.
+    """
+    key = (model_class, str(identifier), name)
+    model = _brief_models.get(key)
+    if model is None:
+        model = model_class(source=SOURCE, identifier=identifier, name=name)
+        model = _brief_models.setdefault(key, model)
+    return model
+
+
 class BaseSchema(Schema):
     class Meta:
         unknown = EXCLUDE
@@ -49,8 +92,8 @@ class KuwoSongSchema(Schema):
     def create_model(self, data, **kwargs):
         if data.get('artistid'):
             artists = [
-                BriefArtistModel(
-                    source=SOURCE,
+                shared_brief_model(
+                    BriefArtistModel,
                     identifier=data.get('artistid'),
                     name=normalize_field(data.get('artist'))
                 )
@@ -58,8 +101,8 @@ class KuwoSongSchema(Schema):
         else:
             artists = []
         if data.get('albumid'):
-            album = BriefAlbumModel(
-                source=SOURCE,
+            album = shared_brief_model(
+                BriefAlbumModel,
                 identifier=data.get('albumid'),
                 name=normalize_field(data.get('album')),
             )
@@ -98,8 +141,8 @@ class KuwoAlbumSchema(Schema):
             source=SOURCE,
             identifier=data.get('identifier'),
             name=normalize_field(data.get('name')),
-            artists=[BriefArtistModel(
-                source=SOURCE,
+            artists=[shared_brief_model(
+                BriefArtistModel,
                 identifier=data.get('artistid'),
                 name=normalize_field(data.get('artist')))],
             description=normalize_field(data.get('albuminfo', '')).replace('\n', '<br>'),
@@ -171,3 +214,120 @@ class KuwoUserPlaylistSchema(Schema):
             identifier=data.get('identifier'),
             name=normalize_field(data.get('name')),
         )
+
+
+class _Fallback(Exception):
+    """ the fast path can't load the data like marshmallow does """
+
+
+def _load_int(value):
+    if type(value) is int:
+        return value
+    if type(value) is str:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise _Fallback
+
+
+def _load_str(value):
+    if type(value) is str:
+        return value
+    raise _Fallback
+
+
+def _compile_field(field):
+    """ return a converter of raw values, as field.deserialize would do """
+    if isinstance(field, fields.Int) and not field.strict:
+        return _load_int
+    if isinstance(field, fields.Str):
+        return _load_str
+    if isinstance(field, fields.Bool) and field.truthy:
+        truthy, falsy = field.truthy, field.falsy
+
+        def load_bool(value):
+            try:
+                if value in truthy:
+                    return True
+                if value in falsy:
+                    return False
+            except TypeError:
+                pass
+            raise _Fallback
+        return load_bool
+    if isinstance(field, fields.List) and isinstance(field.inner, fields.Nested):
+        def load_list(value):
+            if type(value) is not list:
+                raise _Fallback
+            loader = get_loader(type(field.inner.schema))
+            return [loader.load_strict(item) for item in value]
+        return load_list
+
+    def unsupported(value):
+        raise _Fallback
+    return unsupported
+
+
+class FastLoader:
+    """ load raw kuwo dicts into models without running marshmallow
+
+    The fields of the schema are compiled into converters once, then the
+    schema ``create_model`` builds the model. Data the converters can't
+    handle exactly like marshmallow (missing required field, null, unexpected
+    type...) is loaded by marshmallow, which raises the same errors as before.
+    """
+
+    def __init__(self, schema_class):
+        self.schema = schema_class()
+        self._fields = []
+        for name, field in self.schema.load_fields.items():
+            default = field.load_default
+            self._fields.append((name, field.data_key or name, _compile_field(field),
+                                 field.required, field.allow_none, default))
+
+    def load(self, data, many=False):
+        if many:
+            return [self.load(item) for item in data]
+        try:
+            return self.load_strict(data)
+        except _Fallback:
+            return self.schema.load(data)
+
+    def load_strict(self, data):
+        """ :raise _Fallback: the data should be loaded by marshmallow """
+        return self.schema.create_model(self.convert(data))
+
+    def convert(self, data) -> dict:
+        """ convert raw data to the values given to ``create_model``
+
+        :raise _Fallback: the data should be loaded by marshmallow
+        """
+        if type(data) is not dict:
+            raise _Fallback
+        values = {}
+        for name, key, convert, required, allow_none, default in self._fields:
+            value = data.get(key, missing)
+            if value is missing:
+                if required:
+                    raise _Fallback
+                if default is not missing:
+                    values[name] = default() if callable(default) else default
+            elif value is None:
+                if not allow_none:
+                    raise _Fallback
+                values[name] = None
+            else:
+                values[name] = convert(value)
+        return values
+
+
+_loaders = {}
+
+
+def get_loader(schema_class) -> FastLoader:
+    """ get the shared :class:`FastLoader` of a schema class """
+    loader = _loaders.get(schema_class)
+    if loader is None:
+        loader = _loaders[schema_class] = FastLoader(schema_class)
+    return loader
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, Tuple
+
+from feeluown.library import SearchType
+
+from .cache import LRUCache
+from .provider import _SEARCH_SPECS, _deserialize_many, provider
+from .schemas import normalize_str
+
+#: a fetch returns the results of the first page and the total of results
+Fetch = Callable[[str], Awaitable[Tuple[list, int]]]
+
+
+class TypeaheadSearch:
+    """Search while the user types
+
+    Every keystroke may call :meth:`search`. The engine waits ``debounce``
+    seconds before sending a query, and a call supersedes the previous one:
+    the previous call stops waiting, its request is cancelled and it
+    returns None.
+
+    Results are served without a request when
+
+    * the same query was answered less than ``ttl`` seconds ago,
+    * or a prefix of the query was answered with all of its results (the
+      total fits in one page). Results of the prefix are then filtered by
+      the query, the same way the kuwo search matches names.
+
+    The caches are bounded to ``max_entries`` queries each.
+    """
+
+    def __init__(self, type_=SearchType.so, fetch: Optional[Fetch] = None,
+                 debounce: float = 0.2, ttl: float = 30, prefix_ttl: float = 300,
+                 max_entries: int = 256):
+        """
+        :param type_: the search type
+        :param fetch: coroutine function to search a keyword, defaults to
+            the kuwo search API of the type
+        :param debounce: seconds to wait for the next keystroke
+        :param ttl: seconds a query result is reused for the same query
+        :param prefix_ttl: seconds a complete result is used to answer
+            longer queries
+        """
+        self.type_ = SearchType.parse(type_)
+        self.debounce = debounce
+        self._fetch = fetch or self._fetch_api
+        self._exact = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._complete = LRUCache(max_entries=max_entries, ttl=prefix_ttl)
+        self._task: Optional[asyncio.Future] = None
+        #: number of queries sent
+        self.requests = 0
+
+    async def search(self, keyword: str) -> Optional[list]:
+        """Search the keyword, return None if a later call superseded this one"""
+        if self._task is not None:
+            self._task.cancel()
+        task = self._task = asyncio.ensure_future(self._search(keyword))
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self._task is not task:
+                return None
+            raise
+        finally:
+            if self._task is task:
+                self._task = None
+
+    def cancel(self):
+        """Cancel the pending query, if any"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def cached(self, keyword: str) -> Optional[list]:
+        """Return the results of the keyword if they are known without a request"""
+        query = _normalize(keyword)
+        if not query:
+            return []
+        objs = self._exact.get(query)
+        if objs is not None:
+            return objs
+        for end in range(len(query) - 1, 0, -1):
+            objs = self._complete.get(query[:end])
+            if objs is not None:
+                objs = [obj for obj in objs if _matches(query, obj)]
+                self._exact.set(query, objs)
+                return objs
+        return None
+
+    async def _search(self, keyword: str) -> list:
+        objs = self.cached(keyword)
+        if objs is not None:
+            return objs
+        await asyncio.sleep(self.debounce)
+        self.requests += 1
+        objs, total = await self._fetch(keyword)
+        query = _normalize(keyword)
+        self._exact.set(query, objs)
+        if total <= len(objs):
+            self._complete.set(query, objs)
+        return objs
+
+    async def _fetch_api(self, keyword: str) -> Tuple[list, int]:
+        api_method, list_key, schema, _ = _SEARCH_SPECS[self.type_]
+        data = (await getattr(provider.async_api, api_method)(keyword)).get('data') or {}
+        objs = _deserialize_many(data.get(list_key, []), schema)
+        return objs, int(data.get('total') or 0)
+
+
+def _normalize(s: str) -> str:
+    return ' '.join(normalize_str(s).lower().split())
+
+
+def _matches(query: str, obj) -> bool:
+    names = [getattr(obj, attr, '') for attr in ('title', 'name', 'artists_name', 'album_name')]
+    text = _normalize(' '.join(name for name in names if isinstance(name, str)))
+    return all(word in text for word in query.split())
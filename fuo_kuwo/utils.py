@@ -1,6 +1,7 @@
 import ctypes
+from bisect import bisect_right
 from html import unescape
-from typing import Optional, Any
+from typing import List, Optional, Any
 
 
 def int_overflow(val):
@@ -36,6 +37,92 @@ def parse_lrc_time(time: str) -> str:
     return f'{minutes_str}:{seconds_str}.{ms_str}'
 
 
+# Precomputed fields of parse_lrc_time: zero-padded minutes/seconds, and
+# str(ms).ljust(3, '0') for every ms.
+_TWO_DIGITS = [str(i).zfill(2) for i in range(100)]
+_MS_STRS = [str(ms).ljust(3, '0') for ms in range(1000)]
+
+
+def _lrc_line(time: float, text: str) -> str:
+    # The same time computation as parse_lrc_time, with table lookups.
+    minute = int(time // 60)
+    if minute >= 0:
+        minutes_str = _TWO_DIGITS[minute] if minute < 100 else str(minute)
+        seconds_str = _TWO_DIGITS[int(time - minute * 60)]
+        ms_str = _MS_STRS[int((time - int(time)) * 1000)]
+        time_str = minutes_str + ':' + seconds_str + '.' + ms_str
+    else:
+        # The tables do not cover negative times.
+        time_str = parse_lrc_time(time)
+    if '&' in text:
+        text = unescape(text)
+    return '[' + time_str + ']' + text
+
+
+class LyricTimeline:
+    """ lyric lines indexed by time, built line by line
+
+    Lines are kept sorted by their offset, so that the line to show at a
+    playback position is found with a binary search.
+    """
+
+    def __init__(self):
+        #: offsets of the lines in milliseconds, sorted
+        self.offsets: List[int] = []
+        self.lines: List[str] = []
+        self._lrc_lines: List[str] = []
+
+    def append(self, time: str, text: str):
+        """ add a line
+
+        :param time: float time string, in seconds
+        :param text: line text, may contain html entities
+        """
+        seconds = float(time)
+        lrc_line = _lrc_line(seconds, text)
+        self._lrc_lines.append(lrc_line)
+        text = lrc_line[lrc_line.index(']') + 1:]
+        offset = round(seconds * 1000)
+        if not self.offsets or offset >= self.offsets[-1]:
+            self.offsets.append(offset)
+            self.lines.append(text)
+        else:
+            index = bisect_right(self.offsets, offset)
+            self.offsets.insert(index, offset)
+            self.lines.insert(index, text)
+
+    def index_at(self, position: float) -> int:
+        """ index of the line at a playback position (in seconds), -1 if none """
+        return bisect_right(self.offsets, position * 1000) - 1
+
+    def line_at(self, position: float) -> Optional[str]:
+        index = self.index_at(position)
+        return self.lines[index] if index >= 0 else None
+
+    def to_lrc(self) -> str:
+        """ lrc file content, lines in the order they were added """
+        return '\n'.join(self._lrc_lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+
+def parse_lyrics_timeline(lyrics: Optional[list]) -> Optional[LyricTimeline]:
+    """ parse lyrics to a :class:`LyricTimeline`
+
+    :param lyrics: lyrics list
+    :type lyrics: list, optional
+    """
+    if not lyrics:
+        return None
+    timeline = LyricTimeline()
+    for line in lyrics:
+        time = line.get('time')
+        if time:
+            timeline.append(time, line.get('lineLyric'))
+    return timeline
+
+
 def parse_lyrics(lyrics: Optional[list]) -> Optional[str]:
     """ parse lyrics to lrc file content
 
@@ -46,14 +133,8 @@ def parse_lyrics(lyrics: Optional[list]) -> Optional[str]:
     """
     if not lyrics:
         return None
-    content = []
-    for line in lyrics:
-        time = line.get('time')
-        ll = line.get('lineLyric')
-        if not time:
-            continue
-        content.append(f'[{parse_lrc_time(time)}]{unescape(ll)}')
-    return "\n".join(content)
+    return '\n'.join([_lrc_line(float(line['time']), line.get('lineLyric'))
+                      for line in lyrics if line.get('time')])
 
 
 def digest_encrypt(s: str) -> str:
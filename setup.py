@@ -10,6 +10,9 @@ package_data = \
 install_requires = \
 ['feeluown>=3.8.12', 'marshmallow', 'requests']
 
+extras_require = \
+{'async': ['aiohttp'], 'numpy': ['numpy'], 'pinyin': ['pypinyin']}
+
 entry_points = \
 {'fuo.plugins_v1': ['kuwo = fuo_kuwo']}
 
@@ -22,6 +25,7 @@ setup_kwargs = {
     'packages': packages,
     'package_data': package_data,
     'install_requires': install_requires,
+    'extras_require': extras_require,
     'entry_points': entry_points,
     'python_requires': '>=3.8,<4.0',
 }
@@ -0,0 +1,61 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class LocalServer:
+    """A local HTTP server, responses are set per path in ``routes``
+
+    A route is the response body as bytes, or a ``(body, headers)`` tuple.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        #: paths of the received requests, in order
+        self.requests = []
+        #: client port of each request, the same for requests of one connection
+        self.ports = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                server.requests.append(path)
+                server.ports.append(self.client_address[1])
+                route = server.routes.get(path)
+                if route is None:
+                    self.send_error(404)
+                    return
+                body, headers = route if isinstance(route, tuple) else (route, {})
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        host, port = self._server.server_address[:2]
+        self.url = f'http://{host}:{port}'
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = LocalServer()
+    server.start()
+    yield server
+    server.stop()
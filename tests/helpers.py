@@ -0,0 +1,45 @@
+import json
+
+from fuo_kuwo.jsonstream import JsonListStream
+
+
+def load_example(name):
+    """Load the json response ``examples/<name>.json``"""
+    with open(f'./examples/{name}.json', 'r') as f:
+        return json.load(f)
+
+
+def paged_api(items, list_key='list', total=None, response=None, overlap=0, missing=(),
+              fetched=None, closed=None):
+    """Fake a paginated API serving ``items``
+
+    The returned function takes ``(identifier, limit, page, stream=False)``
+    like the list endpoints of KuwoApi. With ``stream=True``, the page is a
+    :class:`JsonListStream` over chunks of the response.
+
+    :param total: total of the responses, defaults to the number of items
+    :param response: response whose data holds the total and the page items
+    :param overlap: number of items shared by the end of a page and the
+        start of the next one
+    :param missing: indexes of items left out of their page
+    :param fetched: list the requested pages are appended to
+    :param closed: list the pages of closed streams are appended to
+    """
+    response = response or {'data': {}}
+
+    def request(identifier, limit, page, stream=False):
+        if fetched is not None:
+            fetched.append(page)
+        start = (page - 1) * (limit - overlap)
+        page_items = [items[i] for i in range(start, min(start + limit, len(items)))
+                      if i not in missing]
+        data = dict(response['data'], total=len(items) if total is None else total)
+        data[list_key] = page_items
+        js = dict(response, data=data)
+        if not stream:
+            return js
+        raw = json.dumps(js)
+        close = None if closed is None else (lambda: closed.append(page))
+        return JsonListStream([raw[i:i + 50] for i in range(0, len(raw), 50)],
+                              ('data', list_key), close=close)
+    return request
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from feeluown.excs import ProviderIOError
+from fuo_kuwo.api import KuwoApi
+
+# aiohttp is only installed with the async extra.
+pytest.importorskip('aiohttp')
+from fuo_kuwo.aio_api import AsyncKuwoApi  # noqa: E402
+
+SEARCH_PATH = '/api/www/search/searchMusicBykeyWord'
+
+
+@pytest.fixture
+def api(http_server, monkeypatch):
+    monkeypatch.setattr(KuwoApi, 'API_BASE', http_server.url + '/api/www')
+    api = AsyncKuwoApi()
+    yield api
+    api._sessions.clear()
+
+
+class TestAsyncKuwoApi:
+    def test_json_response(self, api, http_server):
+        with open('./examples/search.json', 'rb') as f:
+            # Kuwo does not always respond with an application/json content type.
+            http_server.routes[SEARCH_PATH] = (f.read(), {'Content-Type': 'text/plain'})
+
+        async def search():
+            try:
+                return await api.search('hello')
+            finally:
+                await api.close()
+
+        js = asyncio.run(search())
+        assert len(js['data']['list']) == 30
+
+    def test_no_stream(self, api):
+        with pytest.raises(TypeError):
+            api.search('hello', stream=True)
+
+    def test_errors(self, api, http_server):
+        http_server.routes[SEARCH_PATH] = b'<html></html>'
+
+        async def search():
+            try:
+                await api.search('hello')
+            finally:
+                await api.close()
+
+        with pytest.raises(ProviderIOError):
+            asyncio.run(search())
+        # Nothing listens to the port anymore.
+        http_server.stop()
+        with pytest.raises(ProviderIOError):
+            asyncio.run(search())
+
+    def test_session_per_loop(self, api, http_server):
+        http_server.routes[SEARCH_PATH] = b'{"code": 200}'
+
+        async def search_twice():
+            await api.search('hello')
+            session = api._get_session()
+            await api.search('hello')
+            assert api._get_session() is session
+            return session
+
+        # The session of a finished loop is not reused by the next one.
+        first = asyncio.run(search_twice())
+        second = asyncio.run(search_twice())
+        assert second is not first
+        assert list(api._sessions.values()) == [second]
+        assert http_server.requests == [SEARCH_PATH] * 4
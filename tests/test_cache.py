@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fuo_kuwo.api import KuwoApi, SingleFlight
+from fuo_kuwo.cache import LRUCache, ResponseCache
+from tests.helpers import load_example
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class TestResponseCache:
+    def test_get_set(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+        assert cache.get('a') == (None, False)
+        cache.set('a', {'code': 200}, ttl=60)
+        assert cache.get('a') == ({'code': 200}, True)
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_stale(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_stale=60)
+        cache.set('a', [1], ttl=-1)
+        assert cache.get('a') == ([1], False)
+        cache.set('b', [2], ttl=-120)
+        assert cache.get('b') == (None, False)
+        assert cache.stats.stale_hits == 1
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+        cache.set('a', 1, ttl=60)
+        cache.set('b', 2, ttl=60)
+        cache.get('a')
+        cache.set('c', 3, ttl=60)
+        assert len(cache) == 2
+        assert cache.get('b') == (None, False)
+        assert cache.get('a') == (1, True)
+
+    def test_persistent(self, tmp_path):
+        path = str(tmp_path / 'cache.sqlite')
+        ResponseCache(path).set('a', 1, ttl=60)
+        assert ResponseCache(path).get('a') == (1, True)
+
+
+class TestLRUCache:
+    def test_max_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert len(cache) == 2
+        assert cache.stats.hit_ratio == 0.5
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_bytes=10, sizeof=len)
+        cache.set('a', 'x' * 6)
+        cache.set('b', 'x' * 6)
+        assert cache.get('a') is None
+        assert cache.nbytes == 6
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=-1)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert len(cache) == 1
+
+
+class TestKuwoApiCache:
+    def test_album_info_is_cached(self, tmp_path, monkeypatch):
+        data = load_example('album_info')
+        calls = []
+
+        def request(method, uri, **kwargs):
+            calls.append(uri)
+            return FakeResponse(data)
+
+        api = KuwoApi()
+        monkeypatch.setattr(api, 'request', request)
+        api.enable_cache(str(tmp_path / 'cache.sqlite'))
+        try:
+            assert api.get_album_info(13962847) == data
+            assert api.get_album_info(13962847) == data
+            api.search('hello')
+            api.search('hello')
+            assert len(calls) == 3
+            assert api.cache.stats.hits == 1
+        finally:
+            api.disable_cache()
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return {'code': 200}
+
+        with ThreadPoolExecutor(4) as executor:
+            first = executor.submit(single_flight.do, 'key', fetch)
+            started.wait()
+            others = [executor.submit(single_flight.do, 'key', fetch) for _ in range(3)]
+            results = [f.result() for f in [first] + others]
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert single_flight.coalesced == 3
+        # The key is released once the call is done.
+        single_flight.do('key', fetch)
+        assert len(calls) == 2
+
+
+class TestMobiQueryCache:
+    def test_query_is_encrypted_once(self, monkeypatch):
+        uris = []
+        api = KuwoApi()
+        monkeypatch.setattr(api, '_get_text', lambda uri, **kwargs: uris.append(uri))
+        api.mobi_query_cache.clear()
+        hits = api.mobi_query_cache.stats.hits
+        api.get_song_url_mobi(6910877, 'shq')
+        api.get_song_url_mobi(6910877, 'shq')
+        api.get_song_url_mobi('6910877', 'hq')
+        assert uris[0] == uris[1] != uris[2]
+        assert len(api.mobi_query_cache) == 2
+        assert api.mobi_query_cache.stats.hits == hits + 1
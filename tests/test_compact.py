@@ -0,0 +1,37 @@
+import pytest
+from marshmallow import ValidationError
+
+from fuo_kuwo.compact import SongTable
+from fuo_kuwo.schemas import KuwoSongSchema
+from tests.helpers import load_example
+
+
+class TestSongTable:
+    def test_same_models_as_schema(self):
+        songs = load_example('playlist_info')['data']['musicList']
+        table = SongTable()
+        rows = [table.append(song) for song in songs]
+        assert len(table) == len(songs)
+        for row, data in zip(rows, songs):
+            song, expected = table.get(row), KuwoSongSchema().load(data)
+            assert song.dict() == expected.dict()
+            assert table.identifier(row) == expected.identifier
+            assert song.cache_get('lossless') == expected.cache_get('lossless')
+            assert song.cache_get('hasmv') == expected.cache_get('hasmv')
+
+    def test_strings_are_interned(self):
+        # Two loads give equal, but distinct, string objects.
+        first, second = (load_example('album_info')['data']['musicList'][0] for _ in range(2))
+        assert first['album'] is not second['album']
+        table = SongTable()
+        rows = [table.append(first), table.append(second)]
+        assert table._strs['album'][rows[0]] is table._strs['album'][rows[1]]
+
+    def test_fallback(self):
+        data = load_example('song_detail')['data']
+        table = SongTable()
+        row = table.append(dict(data, duration=float(data['duration'])))
+        assert table.get(row) is table.get(row)
+        assert table.identifier(row) == str(data['rid'])
+        with pytest.raises(ValidationError):
+            table.append(dict(data, rid=None))
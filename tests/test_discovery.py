@@ -0,0 +1,80 @@
+import time
+
+from feeluown.excs import ProviderIOError
+from fuo_kuwo.discovery import ARTIST_CATEGORIES, DiscoveryAggregator
+from fuo_kuwo.provider import provider
+from tests.helpers import load_example
+
+
+def patch_api(monkeypatch, calls, fail=()):
+    def endpoint(name, example):
+        def request(*args):
+            calls.append(name)
+            if name in fail:
+                raise ProviderIOError(f'{name} failed')
+            time.sleep(0.05)
+            return load_example(example)
+        return request
+
+    for name, example in [('banner', 'banner'), ('rank_top', 'rank_top'),
+                          ('rank_index', 'rank_index'),
+                          ('playlist_recommend', 'playlist_recommend'),
+                          ('radio_list', 'radio_list'), ('playlist_tags', 'playlist_tags'),
+                          ('artists_recommend', 'artist_recommend')]:
+        monkeypatch.setattr(provider.api, name, endpoint(name, example))
+
+
+class TestDiscoveryAggregator:
+    def test_fetch(self, tmp_path, monkeypatch):
+        calls = []
+        patch_api(monkeypatch, calls)
+        aggregator = DiscoveryAggregator(provider, str(tmp_path / 'discovery.json'))
+        start = time.time()
+        discovery = aggregator.fetch()
+        # Requests are sent concurrently.
+        assert time.time() - start < 0.05 * 5
+        assert len(calls) == 10
+        assert len(discovery.banners) == 5
+        assert len(discovery.top_ranks[0]['songs']) == 8
+        assert len(discovery.playlists) == 11
+        assert len(discovery.radios) == 9
+        assert len(discovery.rank_groups) == 6
+        assert len(discovery.playlist_tags) == 7
+        assert [len(discovery.artists[c]) for c in ARTIST_CATEGORIES] == [20] * 4
+
+    def test_snapshot(self, tmp_path, monkeypatch):
+        calls = []
+        path = str(tmp_path / 'discovery.json')
+        patch_api(monkeypatch, calls)
+        aggregator = DiscoveryAggregator(provider, path)
+        assert aggregator.get() is None
+        # The snapshot is being fetched in background.
+        assert aggregator.refresh().result() is aggregator.get()
+        assert len(calls) == 10
+        calls.clear()
+
+        # A fresh snapshot is rendered at startup without any request.
+        discovery = DiscoveryAggregator(provider, path).get()
+        assert len(discovery.playlists) == 11
+        assert calls == []
+
+        # A stale one too, while a new one is fetched in background.
+        aggregator = DiscoveryAggregator(provider, path, ttl=0)
+        stale = aggregator.get()
+        assert len(stale.playlists) == 11
+        fresh = aggregator.refresh().result()
+        assert fresh.fetched_at > stale.fetched_at
+        assert len(calls) == 10
+        aggregator.ttl = 60
+        assert aggregator.get() is fresh
+        assert len(calls) == 10
+
+    def test_failed_requests_keep_previous_responses(self, tmp_path, monkeypatch):
+        calls = []
+        path = str(tmp_path / 'discovery.json')
+        patch_api(monkeypatch, calls)
+        DiscoveryAggregator(provider, path).fetch()
+        patch_api(monkeypatch, calls, fail={'banner', 'playlist_recommend'})
+        discovery = DiscoveryAggregator(provider, path).fetch()
+        assert len(discovery.banners) == 5
+        assert len(discovery.playlists) == 11
@@ -0,0 +1,49 @@
+import os
+import random
+
+import pytest
+
+from fuo_kuwo.enc.DES import _encrypt_bitwise, base64_encrypt, base64_encrypt_many, encrypt
+from fuo_kuwo.enc.decrypt import KwDecrypt
+
+
+class TestDES:
+    def test_encrypt_matches_bitwise(self):
+        rand = random.Random(0)
+        for size in list(range(20)) + [63, 64, 65, 300]:
+            msg = bytes(rand.randrange(256) for _ in range(size))
+            key = bytes(rand.randrange(256) for _ in range(8))
+            assert encrypt(msg) == _encrypt_bitwise(msg)
+            assert encrypt(msg, key) == _encrypt_bitwise(msg, key)
+
+    def test_base64_encrypt(self):
+        payload = 'corp=kuwo&p2p=1&type=convert_url2&sig=0&format=mp3|aac&rid=6910877'
+        assert base64_encrypt(payload) == base64_encrypt(payload.encode())
+        assert len(base64_encrypt(payload)) == 96
+
+    def test_base64_encrypt_many(self):
+        rand = random.Random(0)
+        msgs = [bytes(rand.randrange(256) for _ in range(rand.randrange(80)))
+                for _ in range(100)]
+        msgs.append('corp=kuwo&p2p=1&type=convert_url2&sig=0&format=mp3|aac&rid=6910877')
+        assert base64_encrypt_many(msgs) == [base64_encrypt(msg) for msg in msgs]
+        assert base64_encrypt_many(msgs[:2]) == [base64_encrypt(msg) for msg in msgs[:2]]
+        assert base64_encrypt_many([]) == []
+
+
+class TestKwDecrypt:
+    def test_round_trip(self):
+        for size in list(range(20)) + [4096, 65537]:
+            data = os.urandom(size)
+            assert KwDecrypt.decrypt(KwDecrypt.encrypt(data)) == data
+
+    def test_xor(self):
+        data = os.urandom(100)
+        key = KwDecrypt.CONST_1
+        assert KwDecrypt.xor(data) == bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+
+    def test_aba(self):
+        assert KwDecrypt.aba(b'kuwo music', 4) == b'a3V3bw=='
+        assert KwDecrypt.abb(b'a3V3bw==') == b'kuwo'
+        with pytest.raises(ValueError):
+            KwDecrypt.decrypt('not base64!')
@@ -0,0 +1,100 @@
+from feeluown.library import SearchType
+from fuo_kuwo.index import LocalIndex, _match_query
+from fuo_kuwo.provider import create_random_reader, provider, search_song
+from fuo_kuwo.schemas import KuwoAlbumSchema, KuwoSongSchema, get_loader
+from tests.helpers import load_example, paged_api
+
+
+def add_all(index, items, schema_class):
+    for item in items:
+        index.add(schema_class, item, get_loader(schema_class).load(item))
+
+
+class TestLocalIndex:
+    def test_search(self, tmp_path):
+        index = LocalIndex(str(tmp_path / 'index.sqlite'), batch_size=10)
+        add_all(index, load_example('search')['data']['list'], KuwoSongSchema)
+        add_all(index, load_example('search_album')['data']['albumList'], KuwoAlbumSchema)
+
+        songs = index.search('hello ade', SearchType.so, limit=100)
+        assert songs
+        assert all('adele' in song.artists_name.lower() for song in songs)
+        expected = get_loader(KuwoSongSchema).load(load_example('search')['data']['list'][2])
+        assert expected.dict() in [song.dict() for song in songs]
+
+        # CJK names are matched by char sequences.
+        songs = index.search('王杰', SearchType.so, limit=100)
+        assert {song.artists_name for song in songs} == {'王杰'}
+        assert index.search('杰王', SearchType.so) == []
+        albums = index.search('beautiful day', SearchType.al)
+        assert [album.name for album in albums] == ['Today Is A Beautiful Day']
+        assert len(index.search('物語 supercell', SearchType.al)) == 3
+        assert index.search('!!', SearchType.so) == []
+
+    def test_update_and_evict(self, tmp_path):
+        path = str(tmp_path / 'index.sqlite')
+        items = load_example('search')['data']['list']  # 30 songs
+        index = LocalIndex(path, max_entries=20, batch_size=10)
+        add_all(index, items, KuwoSongSchema)
+        add_all(index, items[-5:], KuwoSongSchema)
+        index.flush()
+        assert len(index) == 20
+        renamed = dict(items[-1], name='Goodbye')
+        add_all(index, [renamed], KuwoSongSchema)
+        assert [song.title for song in index.search('goodbye')] == ['Goodbye']
+        index.close()
+        # The first added songs are evicted.
+        index = LocalIndex(path, max_entries=20)
+        assert len(index) == 20
+        assert index.search(items[0]['artist']) == []
+
+    def test_match_query(self):
+        assert _match_query('Hello  周杰伦') == '"hello" AND "周 杰 伦"*'
+        assert _match_query('a"b') == '"a""b"*'
+        assert _match_query(' - ') is None
+
+
+class TestProviderLocalIndex:
+    def test_search_falls_back_to_api(self, tmp_path, monkeypatch):
+        calls = []
+
+        def search(keyword):
+            calls.append(keyword)
+            return load_example('search')
+
+        monkeypatch.setattr(provider.api, 'search', search)
+        provider.model_cache.clear()
+        provider.enable_local_index(str(tmp_path / 'index.sqlite'))
+        try:
+            assert len(search_song('hello').songs) == 30
+            assert calls == ['hello']
+            # Fetched songs are indexed, so they are found offline.
+            result = search_song('adele')
+            assert calls == ['hello']
+            assert result.songs and all('Adele' in s.artists_name for s in result.songs)
+        finally:
+            provider.disable_local_index()
+
+    def test_compact_reader_is_indexed(self, tmp_path):
+        songs = load_example('search')['data']['list']  # 30 songs
+        provider.enable_local_index(str(tmp_path / 'index.sqlite'))
+        try:
+            reader = create_random_reader(paged_api(songs), 1, KuwoSongSchema, page_size=7,
+                                          compact=True)
+            assert len(reader.readall()) == 30
+            assert len(provider.local_index) == 30
+            assert provider.local_index.search('adele')
+        finally:
+            provider.disable_local_index()
+
+    def test_streamed_pages_are_indexed(self, tmp_path):
+        albums = load_example('search_album')['data']['albumList']  # 30 albums
+        provider.enable_local_index(str(tmp_path / 'index.sqlite'))
+        try:
+            reader = create_random_reader(paged_api(albums, 'albumList'), 1, KuwoAlbumSchema,
+                                          'albumList', page_size=7, stream=True)
+            assert len(reader.readall()) == 30
+            assert len(provider.local_index) == 30
+            assert provider.local_index.search('supercell', SearchType.al)
+        finally:
+            provider.disable_local_index()
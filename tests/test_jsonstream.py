@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from fuo_kuwo.jsonstream import JsonListStream
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestJsonListStream:
+    def test_examples(self):
+        for name, key in [('playlist_info', 'musicList'), ('search', 'list')]:
+            with open(f'./examples/{name}.json', 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)['data']
+            for size in (1, 100, len(raw)):
+                stream = JsonListStream(chunked(raw, size), ('data', key)).open()
+                assert stream.fields['total'] == data['total']
+                assert list(stream) == data[key]
+                assert stream.count == len(data[key])
+                assert stream.fields == {k: v for k, v in data.items() if k != key}
+
+    def test_values_split_across_chunks(self):
+        chunks = ['{"data": {"total": 1', '23, "list": [{"name": "\\u4f60', '"}, 4', '5]}}']
+        stream = JsonListStream(chunks, ('data', 'list')).open()
+        assert stream.fields == {'total': 123}
+        assert list(stream) == [{'name': '你'}, 45]
+
+    def test_missing_list(self):
+        closed = []
+        stream = JsonListStream(['{"code": 500, "data": null}'], ('data', 'list'),
+                                close=lambda: closed.append(1))
+        assert list(stream.open()) == []
+        assert stream.fields == {}
+        assert closed == [1]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            list(JsonListStream(['{"data": {"list": [1 2]}}'], ('data', 'list')))
@@ -1,3 +1,6 @@
+import asyncio
+
+from fuo_kuwo.aio_api import AsyncKuwoApi
 from fuo_kuwo.api import KuwoApi
 
 
@@ -36,3 +39,16 @@ class TestKuwoApi:
         response = KuwoApi().get_song_url_mobi(95828238, 'shq')
         assert isinstance(response, str)
         assert 'url' in response
+
+    def test_async_kuwoapi_search(self):
+        async def search():
+            api = AsyncKuwoApi()
+            try:
+                return await api.search('Hello', 20, 1)
+            finally:
+                await api.close()
+
+        response = asyncio.run(search())
+        assert isinstance(response, dict)
+        assert response.get('code') == 200
+        assert isinstance(response['data']['list'], list)
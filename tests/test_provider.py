@@ -0,0 +1,249 @@
+import threading
+import time
+
+from feeluown.excs import ProviderIOError
+from feeluown.library import BriefAlbumModel, PlaylistModel, SearchType, SongModel
+from feeluown.media import Media, Quality
+from fuo_kuwo.enc.decrypt import KwDecrypt
+from fuo_kuwo.provider import provider, create_g, create_random_reader
+from fuo_kuwo.schemas import KuwoSongSchema
+from tests.helpers import load_example, paged_api
+
+
+class TestProvider:
+    def test_song_get_is_cached(self, monkeypatch):
+        calls = []
+
+        def get_song_detail(identifier):
+            calls.append(identifier)
+            return load_example('song_detail')
+
+        monkeypatch.setattr(provider.api, 'get_song_detail', get_song_detail)
+        provider.model_cache.clear()
+        song = provider.song_get(6910877)
+        assert provider.song_get('6910877') is song
+        assert calls == [6910877]
+
+    def test_search_all(self, monkeypatch):
+        monkeypatch.setattr(provider.api, 'search', lambda *_: load_example('search'))
+        monkeypatch.setattr(provider.api, 'search_album',
+                            lambda *_: load_example('search_album'))
+        result = provider.search_all('hello', [SearchType.so, SearchType.al])
+        assert len(result.songs) == 30
+        assert len(result.albums) == 30
+        assert result.artists == []
+
+    def test_search_all_timeout(self, monkeypatch):
+        def slow_search_album(*_):
+            time.sleep(0.5)
+            return load_example('search_album')
+
+        monkeypatch.setattr(provider.api, 'search', lambda *_: load_example('search'))
+        monkeypatch.setattr(provider.api, 'search_album', slow_search_album)
+        parts = list(provider.search_all_iter('hello', ['song', 'album'], timeout=0.1))
+        assert len(parts) == 1
+        assert len(parts[0].songs) == 30
+        assert parts[0].albums == []
+
+    def test_search_all_slow_consumer(self, monkeypatch):
+        def search_album(*_):
+            time.sleep(0.05)
+            return load_example('search_album')
+
+        monkeypatch.setattr(provider.api, 'search', lambda *_: load_example('search'))
+        monkeypatch.setattr(provider.api, 'search_album', search_album)
+        parts = []
+        for part in provider.search_all_iter('hello', ['song', 'album'], timeout=0.2):
+            parts.append(part)
+            # Albums finish in time, while the caller is busy.
+            time.sleep(0.3)
+        assert len(parts) == 2
+        assert len(parts[-1].albums) == 30
+
+    def test_create_g_prefetch(self):
+        songs = load_example('search')['data']['list']  # 30 songs
+        fetched = []
+        reader = create_g(paged_api(songs, fetched=fetched), 1, KuwoSongSchema,
+                          page_size=7, prefetch=2)
+        assert reader.count == 30
+        assert fetched == [1]
+        assert [s.identifier for s in reader] == [str(s['rid']) for s in songs]
+        assert sorted(fetched) == [1, 2, 3, 4, 5]
+
+    def test_create_g_stream(self):
+        songs = load_example('search')['data']['list']  # 30 songs
+        closed = []
+        reader = create_g(paged_api(songs, closed=closed), 1, KuwoSongSchema,
+                          page_size=7, prefetch=2, stream=True)
+        assert reader.count == 30
+        assert [s.identifier for s in reader] == [str(s['rid']) for s in songs]
+        assert sorted(closed) == [1, 2, 3, 4, 5]
+
+    def test_search_create_rd(self, monkeypatch):
+        songs = load_example('search')['data']['list']  # 30 songs
+        fetched = []
+        # Results shift by one between pages, the last of a page is the
+        # first of the next one.
+        monkeypatch.setattr(provider.api, 'search',
+                            paged_api(songs, total=str(len(songs)), overlap=1, fetched=fetched))
+        reader = provider.search_create_rd('hello', SearchType.so, page_size=10)
+        assert reader.count == 30
+        identifiers = [s.identifier for s in reader]
+        assert identifiers == [str(s['rid']) for s in songs[:28]]
+        assert sorted(fetched) == [1, 2, 3]
+
+    def test_create_random_reader(self):
+        songs = load_example('search')['data']['list']  # 30 songs
+        fetched = []
+        reader = create_random_reader(paged_api(songs, fetched=fetched), 1, KuwoSongSchema,
+                                      page_size=7, prefetch=0)
+        assert reader.count == 30
+        assert reader.read(25).identifier == str(songs[25]['rid'])
+        assert sorted(fetched) == [1, 4, 5]
+        assert reader.read_range(3, 9)[-1].identifier == str(songs[8]['rid'])
+        assert sorted(fetched) == [1, 2, 4, 5]
+        songs_read = reader.readall()
+        assert sorted(fetched) == [1, 2, 3, 4, 5]
+        assert [s.identifier for s in songs_read] == [str(s['rid']) for s in songs]
+
+    def test_create_random_reader_short_pages(self):
+        songs = load_example('search')['data']['list']  # 30 songs
+        # The API promises more songs than its pages hold.
+        get_songs = paged_api(songs, total=40)
+
+        expected = [str(s['rid']) for s in songs]
+        for page_size in (7, 10):
+            reader = create_random_reader(get_songs, 1, KuwoSongSchema, page_size=page_size,
+                                          prefetch=2, compact=False)
+            assert [s.identifier for s in reader.readall()] == expected
+            assert reader.count == 30
+            reader = create_random_reader(get_songs, 1, KuwoSongSchema, page_size=page_size,
+                                          prefetch=2, compact=False)
+            assert [s.identifier for s in reader] == expected
+            assert reader.count == 30
+
+    def test_create_random_reader_short_middle_page(self):
+        songs = load_example('search')['data']['list']  # 30 songs
+        # The last song of page 2 is missing.
+        get_songs = paged_api(songs, missing={13})
+
+        expected = [str(s['rid']) for s in songs if s is not songs[13]]
+        for compact in (False, True):
+            reader = create_random_reader(get_songs, 1, KuwoSongSchema, page_size=7,
+                                          prefetch=2, compact=compact)
+            assert [s.identifier for s in reader] == expected
+            assert reader.count == 29
+            reader = create_random_reader(get_songs, 1, KuwoSongSchema, page_size=7,
+                                          prefetch=0, compact=compact)
+            # Objects after the short page are shifted once it is read.
+            assert reader.read(20).identifier == str(songs[20]['rid'])
+            assert [s.identifier for s in reader.readall()] == expected
+            assert reader.read(20).identifier == str(songs[21]['rid'])
+
+    def test_create_random_reader_concurrency(self):
+        songs = load_example('search')['data']['list']  # 30 songs
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+        api = paged_api(songs)
+
+        def get_songs(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return api(*args, **kwargs)
+
+        reader = create_random_reader(get_songs, 1, KuwoSongSchema, page_size=2, prefetch=0)
+        assert len(reader.readall()) == 30
+        assert max_running[0] == provider.max_workers // 2
+
+    def test_compact_reader_short_pages(self, monkeypatch):
+        # One page of 30 songs, served as pages of 20 with a total of 41.
+        playlist = load_example('playlist_info')
+        songs = playlist['data']['musicList']
+        monkeypatch.setattr(provider.api, 'get_playlist_info',
+                            paged_api(songs, 'musicList', total=playlist['data']['total'],
+                                      response=playlist))
+        monkeypatch.setattr(provider, 'page_size', 20)
+        provider.model_cache.clear()
+        expected = [str(s['rid']) for s in songs]
+        reader = provider.playlist_create_songs_rd(
+            PlaylistModel(source='kuwo', identifier='1', name='', cover='', description=''))
+        assert [s.identifier for s in reader.readall()] == expected
+        reader = provider.playlist_create_songs_rd(
+            PlaylistModel(source='kuwo', identifier='1', name='', cover='', description=''))
+        assert [s.identifier for s in reader] == expected
+        assert reader.count == 30
+
+    def test_album_create_songs_rd(self, monkeypatch):
+        album = load_example('album_info')
+        songs = album['data']['musicList'] * 2  # 60 songs
+        fetched = []
+        monkeypatch.setattr(provider.api, 'get_album_info',
+                            paged_api(songs, 'musicList', response=album, fetched=fetched))
+        reader = provider.album_create_songs_rd(
+            BriefAlbumModel(source='kuwo', identifier='13962847', name=''))
+        assert reader.count == 60
+        songs_read = reader.readall()
+        assert sorted(fetched) == [1, 2, 3]
+        assert [s.identifier for s in songs_read] == [str(s['rid']) for s in songs]
+
+    def test_songs_get_media(self, monkeypatch):
+        with open('./examples/song_url_mobi.txt', 'r') as f:
+            text = f.read()
+
+        def get_song_url_mobi(rid, quality):
+            if rid == 'bad':
+                raise ProviderIOError('bad song')
+            return text if rid != 'empty' else ''
+
+        monkeypatch.setattr(provider.api, 'get_song_url_mobi', get_song_url_mobi)
+        songs = [SongModel(source='kuwo', identifier=identifier, title='', artists=[],
+                           album=None, duration=0)
+                 for identifier in ('1', 'bad', 'empty', '2')]
+        results = provider.songs_get_media(songs, Quality.Audio.shq, concurrency=2)
+        assert isinstance(results[0], Media)
+        assert isinstance(results[1], ProviderIOError)
+        assert results[2] is None
+        assert results[3].url == results[0].url
+        assert songs[3].cache_get('media_shq') == (results[3], True)
+
+    def test_prefetch_media(self, monkeypatch):
+        with open('./examples/song_url_mobi.txt', 'r') as f:
+            text = f.read()
+        calls = []
+
+        def get_song_url_mobi(rid, quality):
+            calls.append(rid)
+            return text
+
+        monkeypatch.setattr(provider.api, 'get_song_url_mobi', get_song_url_mobi)
+        songs = []
+        for identifier in ('1', '2', '3'):
+            song = SongModel(source='kuwo', identifier=identifier, title='', artists=[],
+                             album=None, duration=0)
+            song.cache_set('lossless', True)
+            songs.append(song)
+
+        for future in provider.prefetch_media(songs, 'shq<>'):
+            future.result()
+        assert sorted(calls) == ['1', '2']
+        assert songs[0].cache_get('media_shq')[1] is True
+        # Fresh media are not fetched again, media about to expire are.
+        songs[1].cache_set('media_shq_expired_at', time.time() + 10)
+        for future in provider.prefetch_media(songs, 'shq<>'):
+            future.result()
+        assert sorted(calls) == ['1', '2', '2']
+
+    def test_song_get_media_encrypted(self, monkeypatch):
+        with open('./examples/song_url_mobi.txt', 'r') as f:
+            text = f.read()
+        monkeypatch.setattr(provider.api, 'get_song_url_mobi',
+                            lambda rid, quality: KwDecrypt.encrypt(text))
+        song = SongModel(source='kuwo', identifier='3', title='', artists=[],
+                         album=None, duration=0)
+        media = provider.song_fetch_media(song, Quality.Audio.shq)
+        assert media.url.endswith('1816646012.flac')
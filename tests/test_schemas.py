@@ -1,9 +1,18 @@
+import html
 import json
+import unicodedata
 from urllib.parse import urlparse
 
+import pytest
+from marshmallow import ValidationError
+
 from feeluown.library import SongModel, BriefAlbumModel, BriefArtistModel
 from fuo_kuwo.provider import _deserialize
-from fuo_kuwo.schemas import KuwoSongSchema, KuwoArtistSchema
+from fuo_kuwo.schemas import (
+    KuwoSongSchema, KuwoAlbumSchema, KuwoArtistSchema, KuwoPlaylistSchema, get_loader,
+    normalize_cache_info, normalize_str,
+)
+from tests.helpers import load_example
 
 
 class TestSchemas:
@@ -37,3 +46,65 @@ class TestSchemas:
                 assert uri.hostname == 'star.kuwo.cn'
                 uri.path.endswith('.jpg')
                 assert isinstance(artist.description, str)
+
+
+class TestFastLoader:
+    @pytest.mark.parametrize('name, list_key, schema_class', [
+        ('search', 'list', KuwoSongSchema),
+        ('playlist_info', 'musicList', KuwoSongSchema),
+        ('rank_music', 'musicList', KuwoSongSchema),
+        ('song_detail', None, KuwoSongSchema),
+        ('album_info', None, KuwoAlbumSchema),
+        ('artist_albums', 'albumList', KuwoAlbumSchema),
+        ('artist_info', None, KuwoArtistSchema),
+        ('search_artist', 'artistList', KuwoArtistSchema),
+        ('playlist_info', None, KuwoPlaylistSchema),
+        ('search_playlist', 'list', KuwoPlaylistSchema),
+    ])
+    def test_same_models_as_marshmallow(self, name, list_key, schema_class):
+        data = load_example(name)['data']
+        items = data[list_key] if list_key else [data]
+        models = get_loader(schema_class).load(items, many=True)
+        for item, model in zip(items, models):
+            expected = schema_class().load(item)
+            assert type(model) is type(expected)
+            assert model.dict() == expected.dict()
+            if schema_class is KuwoSongSchema:
+                assert model.cache_get('lossless') == expected.cache_get('lossless')
+                assert model.cache_get('hasmv') == expected.cache_get('hasmv')
+
+    def test_malformed_item_falls_back(self):
+        data = load_example('song_detail')['data']
+        loader = get_loader(KuwoSongSchema)
+        # Marshmallow accepts floats for int fields, the fast path does not.
+        song = loader.load(dict(data, duration=float(data['duration'])))
+        assert song.duration == int(data['duration']) * 1000
+        with pytest.raises(ValidationError):
+            loader.load(dict(data, rid=None))
+
+
+class TestSharedBriefModels:
+    def test_songs_share_brief_models(self):
+        data = load_example('album_info')['data']['musicList']
+        songs = get_loader(KuwoSongSchema).load(data[:2] + data[:1], many=True)
+        assert songs[0].album is songs[1].album
+        assert songs[0].artists[0] is songs[2].artists[0]
+        assert songs[0].artists[0] is not songs[1].artists[0]
+
+
+class TestNormalizeStr:
+    def test_same_as_unescape_and_nfkc(self):
+        songs = load_example('playlist_info')['data']['musicList']
+        strings = [song[key] for song in songs for key in ('name', 'artist', 'album')]
+        strings += ['Tom&nbsp;Jerry', 'Ｋｕｗｏ', 'a&amp;b', '周杰伦', 'x' * 300 + '&lt;']
+        for s in strings:
+            assert normalize_str(s) == unicodedata.normalize('NFKC', html.unescape(s))
+
+    def test_cached(self):
+        hits = normalize_cache_info().hits
+        first = normalize_str('周杰伦&amp;')
+        assert normalize_str('周杰伦&amp;') is first
+        assert normalize_cache_info().hits == hits + 1
+        # ASCII strings without entities are returned as is.
+        s = 'plain ascii'
+        assert normalize_str(s) is s
@@ -0,0 +1,19 @@
+from fuo_kuwo.api import KuwoApi
+
+SEARCH_PATH = '/api/www/search/searchMusicBykeyWord'
+
+
+class TestKuwoApiSession:
+    def test_shared_session(self, http_server, monkeypatch):
+        monkeypatch.setattr(KuwoApi, 'API_BASE', http_server.url + '/api/www')
+        http_server.routes[SEARCH_PATH] = (b'{"code": 200}', {'Set-Cookie': 'token=abc; Path=/'})
+        api = KuwoApi()
+        session = api._session
+        assert api.search('hello') == {'code': 200}
+        assert api.search('world') == {'code': 200}
+        assert api._session is session
+        # Both requests were sent through one kept-alive connection.
+        assert len(http_server.ports) == 2
+        assert http_server.ports[0] == http_server.ports[1]
+        # Cookies set by the server are not sent with the next calls.
+        assert len(session.cookies) == 0
@@ -0,0 +1,77 @@
+import asyncio
+
+from feeluown.library import SearchType
+from fuo_kuwo.schemas import KuwoSongSchema
+from fuo_kuwo.provider import _deserialize_many
+from fuo_kuwo.typeahead import TypeaheadSearch
+from tests.helpers import load_example
+
+
+def load_songs():
+    return _deserialize_many(load_example('search')['data']['list'], KuwoSongSchema)
+
+
+class TestTypeaheadSearch:
+    def test_superseded_queries_are_cancelled(self):
+        songs = load_songs()
+        keywords = []
+
+        async def fetch(keyword):
+            keywords.append(keyword)
+            await asyncio.sleep(0.05)
+            return songs, 1000
+
+        async def main():
+            engine = TypeaheadSearch(SearchType.so, fetch=fetch, debounce=0.02)
+            first = asyncio.ensure_future(engine.search('he'))
+            await asyncio.sleep(0.01)
+            # Still debounced, no request is sent.
+            second = asyncio.ensure_future(engine.search('hel'))
+            await asyncio.sleep(0.04)
+            # The request for 'hel' is in flight.
+            third = asyncio.ensure_future(engine.search('hello'))
+            return await asyncio.gather(first, second, third), engine
+
+        results, engine = asyncio.run(main())
+        assert results[:2] == [None, None]
+        assert results[2] is songs
+        assert keywords == ['hel', 'hello']
+        assert engine.requests == 2
+
+    def test_cache(self):
+        songs = load_songs()
+        keywords = []
+
+        async def fetch(keyword):
+            keywords.append(keyword)
+            return songs, len(songs)
+
+        async def main():
+            engine = TypeaheadSearch(SearchType.so, fetch=fetch, debounce=0)
+            results = [await engine.search(keyword) for keyword in ('hel', 'HEL', 'hello adele')]
+            return results, engine
+
+        results, engine = asyncio.run(main())
+        assert keywords == ['hel']
+        assert results[1] is results[0]
+        # All the results of 'hel' are known, the ones of the longer query
+        # are filtered from them.
+        assert 0 < len(results[2]) < len(songs)
+        for song in results[2]:
+            assert 'adele' in song.artists_name.lower()
+
+    def test_incomplete_prefix_is_not_filtered(self):
+        songs = load_songs()
+        keywords = []
+
+        async def fetch(keyword):
+            keywords.append(keyword)
+            return songs, 1000
+
+        async def main():
+            engine = TypeaheadSearch(SearchType.so, fetch=fetch, debounce=0)
+            for keyword in ('hel', 'hell'):
+                await engine.search(keyword)
+
+        asyncio.run(main())
+        assert keywords == ['hel', 'hell']
@@ -1,6 +1,8 @@
 import json
+from html import unescape
 
-from fuo_kuwo.utils import parse_lrc_time, parse_lyrics, digest_encrypt
+from fuo_kuwo.utils import parse_lrc_time, parse_lyrics, parse_lyrics_timeline, digest_encrypt
+from tests.helpers import load_example
 
 
 class TestUtils:
@@ -8,6 +10,7 @@ class TestUtils:
         assert parse_lrc_time("0.00") == "00:00.000"
         assert parse_lrc_time("6.71") == "00:06.710"
         assert parse_lrc_time("69.87") == "01:09.870"
+        assert parse_lrc_time("-1.5") == "-1:58.-500"
 
     def test_parse_lyrics(self):
         with open('./examples/song_lyrics.json', 'r') as f:
@@ -15,6 +18,27 @@ class TestUtils:
             content = parse_lyrics(data.get('data').get('lrclist'))
             assert isinstance(content, str)
 
+    def test_parse_lyrics_output(self):
+        lyrics = load_example('song_lyrics')['data']['lrclist']
+        lyrics = lyrics + [{'time': '3.005', 'lineLyric': 'a&amp;b'}, {'time': '', 'lineLyric': 'x'},
+                           {'time': '-1.5', 'lineLyric': 'y'}]
+        expected = '\n'.join(f"[{parse_lrc_time(line['time'])}]{unescape(line['lineLyric'])}"
+                              for line in lyrics if line['time'])
+        assert parse_lyrics(lyrics) == expected
+
+    def test_lyric_timeline(self):
+        timeline = parse_lyrics_timeline([
+            {'time': '0.00', 'lineLyric': 'title'},
+            {'time': '6.71', 'lineLyric': 'second'},
+            {'time': '3.50', 'lineLyric': 'first'},
+        ])
+        assert timeline.offsets == [0, 3500, 6710]
+        assert timeline.line_at(3.49) == 'title'
+        assert timeline.line_at(3.5) == 'first'
+        assert timeline.line_at(100) == 'second'
+        assert timeline.line_at(-1) is None
+        assert timeline.to_lrc().splitlines()[1] == '[00:06.710]second'
+
     def test_digest_encrypt(self):
         s = 'This is a test string'
         res = digest_encrypt(s)